@@ -3,11 +3,9 @@ from PyInstaller.utils.hooks import collect_all
 
 datas = []
 binaries = []
-hiddenimports = ['rich.live', 'rich.spinner', 'rich.markdown', 'typer', 'psutil', 'send2trash']
+hiddenimports = ['rich.live', 'rich.spinner', 'rich.markdown', 'typer', 'psutil', 'send2trash', 'orjson', 'zstandard', 'h2', 'xxhash']
 tmp_ret = collect_all('psutil')
 datas += tmp_ret[0]; binaries += tmp_ret[1]; hiddenimports += tmp_ret[2]
-tmp_ret = collect_all('rich')
-datas += tmp_ret[0]; binaries += tmp_ret[1]; hiddenimports += tmp_ret[2]
 
 
 a = Analysis(
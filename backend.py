@@ -1,7 +1,21 @@
 import os
+import re
 import json
-from typing import List, Dict, Any, Generator
-from openai import OpenAI
+import logging
+from collections import Counter
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import List, Dict, Any, Generator, Callable, Optional, Tuple
+
+# Optional: orjson parses tool-call arguments several times faster than stdlib json
+try:
+    import orjson
+    _json_loads = orjson.loads
+    _json_dumps_bytes = orjson.dumps
+except ImportError:
+    orjson = None
+    _json_loads = json.loads
+    _json_dumps_bytes = lambda obj: json.dumps(obj, separators=(",", ":")).encode("utf-8")
 from tools import (
     create_file, delete_file, rename_file, get_file_info,
     make_directory, list_directory, is_directory,
@@ -15,7 +29,9 @@ from tools import (
 )
 
 # --- V2 Tools Schema ---
-TOOLS_SCHEMA = [
+# A tuple so the module-level schema cannot be appended to or reordered at runtime;
+# the tool definitions are part of the cached prompt prefix and must stay byte-identical.
+TOOLS_SCHEMA = (
     # 1. Basic File Actions
     {"type": "function", "function": {"name": "create_file", "description": "Create a new file with optional content.", "parameters": {"type": "object", "properties": {"path": {"type": "string"}, "content": {"type": "string"}}, "required": ["path"]}}},
     {"type": "function", "function": {"name": "delete_file", "description": "Delete a file. safe=True moves to recycle bin.", "parameters": {"type": "object", "properties": {"path": {"type": "string"}, "safe": {"type": "boolean"}}, "required": ["path"]}}},
@@ -38,7 +54,7 @@ TOOLS_SCHEMA = [
     {"type": "function", "function": {"name": "append_to_file", "description": "Append content to a file.", "parameters": {"type": "object", "properties": {"path": {"type": "string"}, "content": {"type": "string"}}, "required": ["path", "content"]}}},
     
     # 5. Pro Features
-    {"type": "function", "function": {"name": "zip_folder", "description": "Compress folder to zip.", "parameters": {"type": "object", "properties": {"folder_path": {"type": "string"}, "output_path": {"type": "string"}}, "required": ["folder_path", "output_path"]}}},
+    {"type": "function", "function": {"name": "zip_folder", "description": "Compress folder to zip. mode: store (fastest, for already-compressed media), deflate (default), lzma (smallest), zstd (.tar.zst, multi-threaded).", "parameters": {"type": "object", "properties": {"folder_path": {"type": "string"}, "output_path": {"type": "string"}, "mode": {"type": "string", "enum": ["store", "deflate", "lzma", "zstd"]}}, "required": ["folder_path", "output_path"]}}},
     {"type": "function", "function": {"name": "extract_archive", "description": "Unzip an archive.", "parameters": {"type": "object", "properties": {"archive_path": {"type": "string"}, "output_path": {"type": "string"}}, "required": ["archive_path", "output_path"]}}},
     {"type": "function", "function": {"name": "check_resources", "description": "Check CPU and RAM usage.", "parameters": {"type": "object", "properties": {}, "required": []}}},
     {"type": "function", "function": {"name": "disk_usage", "description": "Check free space on drives.", "parameters": {"type": "object", "properties": {}, "required": []}}},
@@ -48,22 +64,355 @@ TOOLS_SCHEMA = [
     
     # 6. DevOps
     {"type": "function", "function": {"name": "git_manager", "description": "Manage git repo (init, add, commit, push).", "parameters": {"type": "object", "properties": {"repo_path": {"type": "string"}, "remote_url": {"type": "string"}, "commit_message": {"type": "string"}}, "required": ["repo_path"]}}}
-]
+)
+
+# --- Tool Registry ---
+# Built once at import; the schema and the callable set must stay in sync.
+TOOL_REGISTRY: Dict[str, Callable[..., str]] = {f.__name__: f for f in (
+    create_file, delete_file, rename_file, get_file_info,
+    make_directory, list_directory,
+    search_files, organize_files_by_extension,
+    move_file, copy_file,
+    read_file, write_to_file, append_to_file,
+    zip_folder, extract_archive,
+    check_resources, disk_usage, list_processes,
+    find_duplicates, find_large_files,
+    git_manager
+)}
+
+assert {t["function"]["name"] for t in TOOLS_SCHEMA} == TOOL_REGISTRY.keys(), "TOOLS_SCHEMA and TOOL_REGISTRY are out of sync"
+
+# --- Per-Session Tool Specialization ---
+# After a few turns only the tools this session actually uses are sent, plus a stub that
+# lets the model ask for the rest. The subset is rebuilt only every few turns because any
+# change to the tools breaks the provider prompt cache.
+TOOL_SPECIALIZE_AFTER_TURNS = 3
+TOOL_RESPECIALIZE_EVERY = 5
+TOOL_TOP_K = 8
+# Early usage data is thin; pad the subset up to this many tools with the general-purpose
+# file and folder tools that lead TOOLS_SCHEMA, so most turns never need the stub
+TOOL_MIN_ACTIVE = 12
+ALWAYS_ON_TOOLS = {"list_directory", "read_file"}
+MORE_TOOLS_NAME = "request_more_tools"
+MORE_TOOLS_SCHEMA = {"type": "function", "function": {"name": MORE_TOOLS_NAME, "description": "More tools are available (file actions, folders, search, archives, system health, git). Call this if none of the listed tools fits.", "parameters": {"type": "object", "properties": {}, "required": []}}}
+
+# --- Static Prompt Prefix ---
+# Providers cache the prompt prefix (system message + tools) when it is byte-identical
+# across calls and at least ~1024 tokens long. Keep this text stable: any edit, even
+# whitespace, invalidates every cached prefix.
+SYSTEM_PROMPT = """You are RobotCLI, an advanced Windows System Intelligence Agent. You can manage files (create, delete safe, zip), organize folders, and monitor system health (CPU/RAM). Always prefer 'safe' delete (Recycle Bin). When asked to organize, use the organize tool. Be helpful and precise.
+
+## Operating Principles
+- You act on the user's real machine. Every tool call has real side effects, so read the request carefully and only do what was asked.
+- When a request is ambiguous (which folder, which file, overwrite or not), ask a short clarifying question instead of guessing.
+- Prefer the most specific tool for the job. Do not chain several generic tools when one dedicated tool does the work.
+- Never invent tool results. If a tool returns an error, report it plainly and suggest a next step.
+- Keep a running sense of the paths the user has already mentioned in this conversation and reuse them.
+
+## Paths
+- Users often say "downloads", "documents", "desktop", "music", "pictures" or "videos". Pass those words as the path; the tools resolve them to the user's home folders.
+- Relative paths are resolved against the user's home folder first, then the current working directory.
+- Quote paths exactly as the user gave them. Do not change case, separators or extensions unless asked.
+- When creating files, parent folders are created automatically; you do not need a separate make_directory call.
+
+## File Actions
+- create_file fails if the file already exists. Use write_to_file to overwrite and append_to_file to add content at the end.
+- delete_file defaults to safe=True which sends the item to the Recycle Bin. Only pass safe=False when the user explicitly asks for a permanent delete, and confirm first.
+- rename_file keeps the item in its current folder; use move_file to change folders.
+- move_file and copy_file move or copy into a destination folder when the destination is an existing directory, otherwise they use the destination as the new path.
+- get_file_info reports size, creation time and read-only status for a single item.
+
+## Folder Actions
+- list_directory shows at most 50 entries. Mention when the listing was truncated.
+- make_directory creates all missing parents.
+- organize_files_by_extension sorts the top level of a folder into subfolders named after each extension (for example pdfs, jpgs). Hidden files and files without an extension are left in place. Tell the user how many files were moved.
+
+## Search and Analysis
+- search_files matches a substring of the file name, or the end of the name for an extension such as .pdf, and returns at most 50 paths. It searches the Documents folder when no search_path is given.
+- find_large_files lists the 20 largest files above a size threshold in megabytes (default 100), biggest first.
+- find_duplicates compares file contents and reports pairs of identical files. It never deletes anything; offer to delete duplicates only if the user asks.
+- read_file returns the first 2000 characters of a text file. Say so when the content was truncated.
+
+## Archives
+- zip_folder compresses a folder into a .zip archive; the .zip extension is added when missing. Use mode="store" for folders of photos, videos or PDFs, mode="lzma" when the user wants the smallest file, and mode="zstd" (a .tar.zst) only when asked for it.
+- extract_archive unpacks an archive into the output folder.
+
+## System Health
+- check_resources reports CPU and RAM usage.
+- disk_usage reports free space on each drive.
+- list_processes lists the top memory consuming processes. Do not offer to kill processes; you have no tool for that.
+
+## DevOps
+- git_manager initializes a repository if needed, stages all changes, commits with the given message and optionally pushes to remote_url. Always confirm before pushing.
+
+## Response Style
+- Answer in clear, short Markdown. Use bullet lists for multiple items and code formatting for paths and commands.
+- Summarize tool output instead of pasting it verbatim when it is long, but keep exact numbers, sizes and paths.
+- After a destructive action (delete, move, overwrite, organize) state exactly what changed.
+- If nothing needed to be done, say so in one sentence."""
+
+# Providers that need an explicit cache breakpoint; OpenAI and Gemini cache automatically.
+CACHE_CONTROL_PREFIXES = ("anthropic/",)
+
+logger = logging.getLogger(__name__)
+
+def _system_message(model: str) -> Dict[str, Any]:
+    """Builds the static system message, marking it cacheable where the provider requires it."""
+    if model.startswith(CACHE_CONTROL_PREFIXES):
+        return {
+            "role": "system",
+            "content": [{"type": "text", "text": SYSTEM_PROMPT, "cache_control": {"type": "ephemeral"}}],
+        }
+    return {"role": "system", "content": SYSTEM_PROMPT}
+
+def _log_cache_usage(response: Any) -> None:
+    """Logs how many prompt tokens were served from the provider cache."""
+    usage = getattr(response, "usage", None)
+    details = getattr(usage, "prompt_tokens_details", None) if usage else None
+    cached = getattr(details, "cached_tokens", None) if details else None
+    if usage is not None:
+        logger.debug("prompt_tokens=%s cached_tokens=%s", usage.prompt_tokens, cached or 0)
+
+MAX_TOOL_WORKERS = 8
+# Side-effect-free tools. Consecutive calls to these overlap on the pool; any other call is
+# a barrier that runs alone, in the order the model issued it (e.g. make_directory, then move_file).
+READ_ONLY_TOOLS = frozenset({
+    "get_file_info", "list_directory", "search_files", "read_file",
+    "check_resources", "disk_usage", "list_processes",
+    "find_duplicates", "find_large_files",
+})
+
+# --- History Window ---
+MAX_HISTORY_MESSAGES = 40
+HISTORY_CHAR_BUDGET = 60_000
+KEEP_RECENT_TURNS = 6        # user turns kept verbatim when summarizing
+TOOL_TURNS_KEPT = 2          # user turns whose tool traffic is kept
+# Cheap model for prose-only calls: restating tool output and compacting history
+SUMMARY_MODEL = "google/gemini-2.0-flash-001"
+
+def _content_text(message: Dict[str, Any]) -> str:
+    """Flattens a message's content (plain string or list of text parts) to a string."""
+    content = message.get("content") or ""
+    if isinstance(content, list):
+        return "".join(part.get("text", "") for part in content)
+    return content
+
+def _is_tool_traffic(message: Dict[str, Any]) -> bool:
+    return message.get("role") == "tool" or bool(message.get("tool_calls"))
+
+# --- Direct Rendering ---
+# Tools whose raw output already answers the question; shown without a second LLM call.
+DIRECT_RENDER_TOOLS = {
+    "disk_usage": "Disk Usage",
+    "list_processes": "Processes",
+    "check_resources": "System Resources",
+    "find_large_files": "Large Files",
+    "find_duplicates": "Duplicate Files",
+    "list_directory": "Directory Listing",
+    "get_file_info": "File Info",
+}
+
+def _render_direct(name: str, result: str) -> str:
+    """Formats a tool result as Markdown for the Robot panel."""
+    if not result.strip():
+        return f"**{DIRECT_RENDER_TOOLS[name]}**\n\nNothing to report."
+    return f"**{DIRECT_RENDER_TOOLS[name]}**\n\n```\n{result}\n```"
+
+# --- Speculative Tool Prefetch ---
+# Obvious read-only requests start their tool while the first LLM call is in flight.
+# Only side-effect-free tools belong here: a wrong guess is simply discarded.
+SPECULATIVE_RULES = (
+    # The whole message must be the request ("show my downloads"), not a mention of the folder
+    (re.compile(r"^\s*(?:please\s+)?(?:list|show)(?:\s+me)?\s+(?:my\s+|the\s+)?(downloads|documents|desktop|music|pictures|videos)(?:\s+folder)?\s*[.!?]*\s*$", re.I),
+     "list_directory", lambda m: {"path": m.group(1).lower()}),
+    (re.compile(r"\b(?:cpu|ram|memory) usage\b|\bsystem (?:health|resources)\b|\bhow much (?:cpu|ram|memory)\b", re.I),
+     "check_resources", lambda m: {}),
+    (re.compile(r"\b(?:disk|drive) (?:space|usage)\b|\bfree (?:disk )?space\b", re.I),
+     "disk_usage", lambda m: {}),
+    (re.compile(r"\b(?:running|top|active) processes\b|\bwhat(?:'s| is) running\b|\bmemory hogs?\b", re.I),
+     "list_processes", lambda m: {}),
+)
+
+assert {name for _, name, _ in SPECULATIVE_RULES} <= READ_ONLY_TOOLS, "speculative tools must be read-only"
+
+def _predict_tool(user_input: str) -> Optional[Tuple[str, Dict[str, Any]]]:
+    """Cheap keyword classifier for the tool the model is most likely to call."""
+    for pattern, name, make_args in SPECULATIVE_RULES:
+        match = pattern.search(user_input)
+        if match:
+            return name, make_args(match)
+    return None
+
+def _normalize_args(args: Dict[str, Any]) -> Dict[str, Any]:
+    return {k: v.strip().lower() if isinstance(v, str) else v for k, v in args.items()}
+
+# --- Session Log ---
+FSYNC_EVERY_TURNS = 10
+
+def _drop_unanswered_tool_calls(messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Removes tool calls whose results never made it to the log, plus the rest of that turn.
+    
+    A crash between logging the assistant's tool_calls and its tool results leaves an
+    unmatched call, and the API rejects every later request that contains one.
+    """
+    kept: List[Dict[str, Any]] = []
+    i = 0
+    while i < len(messages):
+        message = messages[i]
+        if message.get("tool_calls"):
+            j = i + 1
+            answered = set()
+            while j < len(messages) and messages[j].get("role") == "tool":
+                answered.add(messages[j].get("tool_call_id"))
+                j += 1
+            if {tc["id"] for tc in message["tool_calls"]} <= answered:
+                kept.extend(messages[i:j])
+            else:
+                while j < len(messages) and messages[j].get("role") != "user":
+                    j += 1
+            i = j
+            continue
+        if message.get("role") != "tool":  # a tool result with no call before it is orphaned too
+            kept.append(message)
+        i += 1
+    return kept
+
+def _load_history_log(path: Path) -> List[Dict[str, Any]]:
+    """Reads the last MAX_HISTORY_MESSAGES entries of a session log, starting at a user turn."""
+    messages = []
+    with open(path, "rb") as f:
+        for line in f:
+            try:
+                messages.append(_json_loads(line))
+            except ValueError:
+                pass  # torn final line from a crash
+    messages = messages[-MAX_HISTORY_MESSAGES:]
+    # Never resume mid-turn: orphaned tool results are rejected by the API
+    while messages and messages[0].get("role") != "user":
+        messages.pop(0)
+    return _drop_unanswered_tool_calls(messages)
+
+def _run_tool(func_name: str, arguments: str) -> str:
+    """Dispatches a single tool call, turning any failure into an error string for the model."""
+    try:
+        args = _json_loads(arguments or "{}")
+        func = TOOL_REGISTRY.get(func_name)
+        if func is not None:
+            result = func(**args)
+        else:
+            result = f"Error: Function {func_name} not implemented."
+    except Exception as e:
+        result = f"Execution Error: {str(e)}"
+    return str(result)
 
 class RobotBackend:
-    def __init__(self, api_key: str, model: str = "google/gemini-2.0-flash-001"):
+    def __init__(
+        self,
+        api_key: str,
+        model: str = "google/gemini-2.0-flash-001",
+        summarizer_model: str = SUMMARY_MODEL,
+        history_path: Optional[Path] = None,
+        resume: bool = False,
+        direct_render: bool = True,
+    ):
+        # Deferred: the SDK is heavy and only needed once a session actually starts
+        import httpx
+        from openai import OpenAI
+        
+        # One persistent pool for the whole session; HTTP/2 multiplexes every turn over a
+        # single TLS connection. Requires the h2 package (httpx[http2]).
+        try:
+            import h2  # noqa: F401
+            http2 = True
+        except ImportError:
+            http2 = False
+        self.http_client = httpx.Client(
+            http2=http2,
+            limits=httpx.Limits(max_keepalive_connections=4, keepalive_expiry=300),
+            timeout=httpx.Timeout(120.0, connect=5.0),
+        )
         self.client = OpenAI(
             base_url="https://openrouter.ai/api/v1",
             api_key=api_key,
-            timeout=120.0,
+            http_client=self.http_client,
         )
         self.model = model
-        self.history: List[Dict[str, Any]] = [
-            {"role": "system", "content": "You are RobotCLI, an advanced Windows System Intelligence Agent. You can manage files (create, delete safe, zip), organize folders, and monitor system health (CPU/RAM). Always prefer 'safe' delete (Recycle Bin). When asked to organize, use the organize tool. Be helpful and precise."}
-        ]
+        self.summarizer_model = summarizer_model
+        self.direct_render = direct_render  # set False to always route tool output through the LLM
+        self.turns = 0
+        self.tool_usage: Counter = Counter()
+        self._active_tools = TOOLS_SCHEMA
+        self._speculator = ThreadPoolExecutor(max_workers=1)
+        self.speculation_attempts = 0
+        self.speculation_hits = 0
+        self.history: List[Dict[str, Any]] = [_system_message(model)]
+        
+        # Append-only session log; the system prompt is static and never written
+        self.history_path = history_path
+        self._log_fd: Optional[int] = None
+        self._turns_since_fsync = 0
+        if history_path is not None:
+            # The log is a convenience; an unwritable install folder must not stop the session
+            try:
+                if resume and history_path.exists():
+                    self.history.extend(_load_history_log(history_path))
+                flags = os.O_WRONLY | os.O_CREAT | os.O_APPEND | getattr(os, "O_BINARY", 0)
+                if not resume:
+                    flags |= os.O_TRUNC
+                self._log_fd = os.open(history_path, flags, 0o600)
+            except OSError as e:
+                logger.warning("session log disabled: %s", e)
+
+    def _append(self, message: Dict[str, Any]):
+        """Adds a message to the history and the session log."""
+        self.history.append(message)
+        if self._log_fd is not None:
+            try:
+                os.write(self._log_fd, _json_dumps_bytes(message) + b"\n")
+            except OSError as e:
+                logger.warning("session log disabled: %s", e)
+                os.close(self._log_fd)
+                self._log_fd = None
+
+    def close(self):
+        """Flushes the session log and releases the connection pool."""
+        if self._log_fd is not None:
+            os.fsync(self._log_fd)
+            os.close(self._log_fd)
+            self._log_fd = None
+        self._speculator.shutdown(wait=False)
+        self.http_client.close()
+
+    def _speculate(self, user_input: str) -> Optional[Tuple[str, Dict[str, Any], Future]]:
+        """Starts the predicted tool in the background, if any."""
+        prediction = _predict_tool(user_input)
+        if prediction is None:
+            return None
+        name, args = prediction
+        self.speculation_attempts += 1
+        return name, _normalize_args(args), self._speculator.submit(_run_tool, name, json.dumps(args))
+
+    def _claim_speculation(self, speculation, tool_call: Dict[str, Any]) -> Optional[Future]:
+        """Returns the speculative future if it ran exactly this tool call."""
+        if speculation is None:
+            return None
+        name, args, future = speculation
+        if tool_call["function"]["name"] != name:
+            return None
+        try:
+            call_args = _normalize_args(_json_loads(tool_call["function"]["arguments"] or "{}"))
+        except ValueError:
+            return None
+        if call_args != args:
+            return None
+        self.speculation_hits += 1
+        logger.debug("speculation hit rate %d/%d", self.speculation_hits, self.speculation_attempts)
+        return future
 
     def set_model(self, model: str):
         self.model = model
+        # Rebuild (not mutate) the system message so cache_control matches the new provider.
+        self.history[0] = _system_message(model)
 
     def get_models(self) -> List[str]:
         return [
@@ -73,57 +422,213 @@ class RobotBackend:
             "anthropic/claude-3-opus",
         ]
 
+    def _summarize(self, messages: List[Dict[str, Any]]) -> str:
+        """One-shot summary of older turns using a cheap model."""
+        dumped = "\n".join(f"{m['role']}: {_content_text(m)}" for m in messages)
+        response = self.client.chat.completions.create(
+            model=self.summarizer_model,
+            messages=[{"role": "user", "content": "Summarize this conversation between a user and a file/system assistant. Keep paths, file names and decisions:\n\n" + dumped}]
+        )
+        return response.choices[0].message.content or ""
+
+    def _compact_history(self):
+        """Bounds per-turn prompt size: drops stale tool traffic and summarizes old turns."""
+        user_idx = [i for i, m in enumerate(self.history) if m.get("role") == "user"]
+        if len(user_idx) > TOOL_TURNS_KEPT:
+            cutoff = user_idx[-TOOL_TURNS_KEPT]
+            self.history = [m for i, m in enumerate(self.history) if i >= cutoff or not _is_tool_traffic(m)]
+        
+        total_chars = sum(len(_content_text(m)) for m in self.history)
+        if len(self.history) <= MAX_HISTORY_MESSAGES and total_chars <= HISTORY_CHAR_BUDGET:
+            return
+        
+        user_idx = [i for i, m in enumerate(self.history) if m.get("role") == "user"]
+        if len(user_idx) <= KEEP_RECENT_TURNS:
+            return
+        cutoff = user_idx[-KEEP_RECENT_TURNS]
+        
+        # history[0] is the static system prompt and must stay untouched for prompt caching
+        recent = self.history[cutoff:]
+        try:
+            summary = self._summarize(self.history[1:cutoff])
+            self.history = [self.history[0], {"role": "system", "content": "Summary of earlier conversation: " + summary}] + recent
+        except Exception as e:
+            logger.debug("history summarization failed: %s", e)
+            self.history = [self.history[0]] + recent
+
+    def _select_tools(self):
+        """Returns the tool schemas for this turn, re-specializing on a fixed cadence."""
+        self.turns += 1
+        if self.turns <= TOOL_SPECIALIZE_AFTER_TURNS:
+            return TOOLS_SCHEMA
+        if (self.turns - TOOL_SPECIALIZE_AFTER_TURNS - 1) % TOOL_RESPECIALIZE_EVERY == 0:
+            top_k = {name for name, _ in self.tool_usage.most_common(TOOL_TOP_K)} | ALWAYS_ON_TOOLS
+            for tool in TOOLS_SCHEMA:
+                if len(top_k) >= TOOL_MIN_ACTIVE:
+                    break
+                top_k.add(tool["function"]["name"])
+            self._active_tools = tuple(t for t in TOOLS_SCHEMA if t["function"]["name"] in top_k) + (MORE_TOOLS_SCHEMA,)
+        return self._active_tools
+
+    def _run_tool_calls(self, tool_calls: List[Dict[str, Any]], speculation) -> Generator[Dict[str, Any], None, Dict[str, str]]:
+        """Runs one turn's tool calls, yielding status events and returning results by call id.
+        
+        Runs of read-only calls overlap; every other call waits for what came before it and
+        runs alone, so dependent calls issued in one turn keep their order.
+        """
+        results: Dict[str, str] = {}
+        pending: Dict[Future, Dict[str, Any]] = {}
+        
+        def drain():
+            for future in as_completed(pending):
+                tool_call = pending[future]
+                results[tool_call["id"]] = future.result()
+                yield {"type": "status", "value": f"Completed {tool_call['function']['name']}."}
+            pending.clear()
+        
+        with ThreadPoolExecutor(max_workers=min(MAX_TOOL_WORKERS, len(tool_calls))) as executor:
+            for tool_call in tool_calls:
+                func_name = tool_call["function"]["name"]
+                read_only = func_name in READ_ONLY_TOOLS
+                if not read_only:
+                    yield from drain()
+                    speculation = None  # prefetched before this call's side effects; may be stale
+                
+                future = self._claim_speculation(speculation, tool_call)
+                if future is not None:
+                    speculation = None  # each speculative result is used at most once
+                else:
+                    future = executor.submit(_run_tool, func_name, tool_call["function"]["arguments"])
+                pending[future] = tool_call
+                yield {"type": "status", "value": f"Running {func_name}..."}
+                
+                if not read_only:
+                    yield from drain()
+            yield from drain()
+        return results
+
+    def _direct_render(self, tool_calls: List[Dict[str, Any]], results: Dict[str, str]) -> Optional[str]:
+        """Returns a client-side rendering for a single self-explanatory tool call, else None."""
+        if not self.direct_render or len(tool_calls) != 1:
+            return None
+        tool_call = tool_calls[0]
+        name = tool_call["function"]["name"]
+        result = results[tool_call["id"]]
+        # Let the model explain failures rather than echoing them raw
+        if name not in DIRECT_RENDER_TOOLS or result.startswith(("Error", "Execution Error")):
+            return None
+        return _render_direct(name, result)
+
+    def _stream_completion(self, **kwargs) -> Generator[Dict[str, Any], None, Dict[str, Any]]:
+        """Streams a completion, yielding content deltas and returning the assembled assistant message."""
+        stream = self.client.chat.completions.create(
+            stream=True,
+            stream_options={"include_usage": True},
+            **kwargs
+        )
+
+        content_parts: List[str] = []
+        tool_calls: Dict[int, Dict[str, Any]] = {}
+        for chunk in stream:
+            if chunk.usage:
+                _log_cache_usage(chunk)
+            if not chunk.choices:
+                continue
+
+            delta = chunk.choices[0].delta
+            if delta.content:
+                content_parts.append(delta.content)
+                yield {"type": "content_delta", "value": delta.content}
+
+            # Tool call names/arguments arrive as fragments keyed by their index
+            for tc in delta.tool_calls or []:
+                slot = tool_calls.setdefault(tc.index, {
+                    "id": "",
+                    "type": "function",
+                    "function": {"name": "", "arguments": ""}
+                })
+                if tc.id:
+                    slot["id"] = tc.id
+                if tc.function:
+                    if tc.function.name:
+                        slot["function"]["name"] += tc.function.name
+                    if tc.function.arguments:
+                        slot["function"]["arguments"] += tc.function.arguments
+
+        message: Dict[str, Any] = {"role": "assistant", "content": "".join(content_parts) or None}
+        if tool_calls:
+            message["tool_calls"] = [tool_calls[i] for i in sorted(tool_calls)]
+        return message
+
     def chat_step(self, user_input: str) -> Generator[Dict[str, Any], None, None]:
-        self.history.append({"role": "user", "content": user_input})
+        self._append({"role": "user", "content": user_input})
         
         try:
-            response = self.client.chat.completions.create(
+            speculation = self._speculate(user_input)
+            msg = yield from self._stream_completion(
                 model=self.model,
                 messages=self.history,
-                tools=TOOLS_SCHEMA,
+                tools=self._select_tools(),
                 tool_choice="auto"
             )
             
-            msg = response.choices[0].message
+            if any(tc["function"]["name"] == MORE_TOOLS_NAME for tc in msg.get("tool_calls") or []):
+                # The specialized subset was too narrow; retry with everything until the next rebuild.
+                # Any text streamed with the stub call is regenerated, so the UI drops it first.
+                self._active_tools = TOOLS_SCHEMA
+                yield {"type": "reset"}
+                yield {"type": "status", "value": "Loading all tools..."}
+                msg = yield from self._stream_completion(
+                    model=self.model,
+                    messages=self.history,
+                    tools=TOOLS_SCHEMA,
+                    tool_choice="auto"
+                )
             
-            if msg.tool_calls:
-                self.history.append(msg)
+            if msg.get("tool_calls"):
+                self._append(msg)
+                
+                tool_calls = msg["tool_calls"]
+                results = yield from self._run_tool_calls(tool_calls, speculation)
                 
-                for tool_call in msg.tool_calls:
-                    func_name = tool_call.function.name
-                    args = json.loads(tool_call.function.arguments)
-                    yield {"type": "status", "value": f"Running {func_name}..."}
-                    
-                    # Dispatcher
-                    try:
-                        if func_name in globals():
-                            func = globals()[func_name]
-                            result = func(**args)
-                        else:
-                            result = f"Error: Function {func_name} not implemented."
-                    except Exception as e:
-                        result = f"Execution Error: {str(e)}"
-                    
-                    self.history.append({
-                        "tool_call_id": tool_call.id,
+                # Append in the original order so the model sees a deterministic history
+                for tool_call in tool_calls:
+                    if not results[tool_call["id"]].startswith(("Error", "Execution Error")):
+                        self.tool_usage[tool_call["function"]["name"]] += 1
+                    self._append({
+                        "tool_call_id": tool_call["id"],
                         "role": "tool",
-                        "name": func_name,
-                        "content": str(result)
+                        "name": tool_call["function"]["name"],
+                        "content": results[tool_call["id"]]
                     })
-                    yield {"type": "status", "value": f"Completed {func_name}."}
                 
-                final_response = self.client.chat.completions.create(
-                    model=self.model,
-                    messages=self.history
-                )
-                final_content = final_response.choices[0].message.content
-                self.history.append({"role": "assistant", "content": final_content})
-                yield {"type": "content", "value": final_content}
+                if msg["content"]:
+                    # The UI already shows this turn's preamble; keep the next reply off its last line
+                    yield {"type": "content_delta", "value": "\n\n"}
+                
+                direct = self._direct_render(tool_calls, results)
+                if direct is not None:
+                    # Output already says what the user asked for; skip the restating round-trip
+                    self._append({"role": "assistant", "content": direct})
+                    yield {"type": "content", "value": direct}
+                else:
+                    # Tool selection needs self.model; turning results into prose does not
+                    final_msg = yield from self._stream_completion(
+                        model=self.summarizer_model,
+                        messages=self.history
+                    )
+                    self._append({"role": "assistant", "content": final_msg["content"] or ""})
                 
             else:
-                content = msg.content
-                self.history.append({"role": "assistant", "content": content})
-                yield {"type": "content", "value": content}
+                self._append({"role": "assistant", "content": msg["content"] or ""})
+            
+            self._compact_history()
+            
+            # Batch fsyncs; O_APPEND already keeps each line write atomic
+            self._turns_since_fsync += 1
+            if self._log_fd is not None and self._turns_since_fsync >= FSYNC_EVERY_TURNS:
+                os.fsync(self._log_fd)
+                self._turns_since_fsync = 0
 
         except Exception as e:
             yield {"type": "content", "value": f"Error: {str(e)}"}
@@ -17,15 +17,18 @@ def build():
         '--onefile',
         '--console',
         '--clean',
-        # Add hidden imports if necessary (e.g. some tyrosine/rich internals sometimes need help)
+        # Only the rich submodules actually used are bundled; --collect-all=rich pulls in every one
         '--hidden-import=rich.live',
         '--hidden-import=rich.spinner',
         '--hidden-import=rich.markdown',
         '--hidden-import=typer',
         '--hidden-import=psutil',
         '--hidden-import=send2trash',
+        '--hidden-import=orjson',
+        '--hidden-import=zstandard',
+        '--hidden-import=h2',
+        '--hidden-import=xxhash',
         '--collect-all=psutil',
-        '--collect-all=rich',
     ])
     
     print("\nBuild complete! Executable is in the 'dist' folder.")
@@ -0,0 +1,41 @@
+import os
+import shutil
+import subprocess
+import sys
+
+def build(release: bool = False):
+    print("Building RobotCLI with Nuitka...")
+    
+    # Ensure the Nuitka output directory is clean
+    if os.path.exists("dist"):
+        shutil.rmtree("dist", ignore_errors=True)
+
+    cmd = [
+        sys.executable, '-m', 'nuitka',
+        'main.py',
+        '--onefile',
+        '--standalone',
+        '--output-dir=dist',
+        '--output-filename=RobotCLI.exe',
+        '--assume-yes-for-downloads',
+        # Modules imported lazily inside functions must be listed explicitly
+        '--include-package=rich',
+        '--include-package=openai',
+        '--include-package=httpx',
+        '--include-module=h2',
+        '--include-module=dotenv',
+        '--include-module=orjson',
+        '--include-package=zstandard',
+        '--include-module=xxhash',
+        '--include-package=psutil',
+        '--include-package=send2trash',
+    ]
+    if release:
+        cmd.append('--lto=yes')
+
+    subprocess.run(cmd, check=True)
+    
+    print("\nBuild complete! Executable is in the 'dist' folder.")
+
+if __name__ == "__main__":
+    build(release="--release" in sys.argv)
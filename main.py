@@ -1,16 +1,14 @@
 import os
 import sys
 import time
+import queue
+import threading
+import traceback
 import typer
 from rich.console import Console
-from rich.markdown import Markdown
 from rich.panel import Panel
 from rich.prompt import Prompt
-from rich.spinner import Spinner
-from rich.live import Live
 from rich.theme import Theme
-from rich.style import Style
-from dotenv import load_dotenv
 from pathlib import Path
 from backend import RobotBackend
 
@@ -23,8 +21,10 @@ else:
 # Flag for auto-closing window
 SHOULD_AUTO_CLOSE = False
 
-# Load environment variables
-load_dotenv(dotenv_path=application_path / ".env")
+# Load environment variables (skip importing dotenv when there is nothing to load)
+if (application_path / ".env").exists():
+    from dotenv import load_dotenv
+    load_dotenv(dotenv_path=application_path / ".env")
 
 # Actually, I should use multiple chunks or target specific blocks. 
 # Let's do it in one go if possible, but the file is large. 
@@ -45,6 +45,38 @@ robot_theme = Theme({
 app = typer.Typer(help="RobotCLI: Your Windows AI Agent")
 console = Console(theme=robot_theme, style="black on white") # Light mode base
 
+def _key_pressed() -> bool:
+    """Non-blocking keypress check (any key on Windows, Enter on POSIX terminals)."""
+    if os.name == "nt":
+        import msvcrt
+        if msvcrt.kbhit():
+            msvcrt.getch()
+            return True
+        return False
+    import select
+    if select.select([sys.stdin], [], [], 0)[0]:
+        sys.stdin.readline()
+        return True
+    return False
+
+def countdown_close(seconds: int = 3):
+    """Counts down before closing; a keypress skips the wait."""
+    if not sys.stdin.isatty():
+        return
+    skip_hint = "press any key to skip" if os.name == "nt" else "press Enter to skip"
+    for tick in range(seconds * 10):
+        # One line per second: Rich strips the \r needed to redraw a single line in place
+        if tick % 10 == 0:
+            console.print(f"[cyan]Closing in {seconds - tick // 10}s ({skip_hint})[/cyan]")
+        if _key_pressed():
+            break
+        time.sleep(0.1)
+
+def wait_before_close(prompt: str):
+    """Keeps a double-clicked exe window open; never blocks when there is no terminal (CI)."""
+    if getattr(sys, 'frozen', False) and sys.stdin.isatty():
+        input(prompt)
+
 def get_api_key():
     key = os.getenv("OPENROUTER_API_KEY")
     if not key:
@@ -52,14 +84,80 @@ def get_api_key():
         key = Prompt.ask("Please enter your OpenRouter API Key", password=True)
     return key
 
-def interactive_session(model: str):
+# --- Streaming Renderer ---
+RENDER_INTERVAL = 0.1          # seconds between live frames (10 Hz)
+MARKDOWN_TAIL_CHARS = 4096     # only this much of a streaming reply is re-parsed as Markdown
+_END_OF_STREAM = object()
+
+def _robot_panel(content: str, final: bool = False) -> Panel:
+    """Builds the reply panel; while streaming, only the tail is parsed as Markdown."""
+    from rich.console import Group
+    from rich.markdown import Markdown
+    from rich.text import Text
+
+    if final or len(content) <= MARKDOWN_TAIL_CHARS:
+        body = Markdown(content)
+    else:
+        # Split on a paragraph boundary so the Markdown tail starts cleanly
+        split = content.rfind("\n\n", 0, len(content) - MARKDOWN_TAIL_CHARS)
+        split = split + 2 if split != -1 else len(content) - MARKDOWN_TAIL_CHARS
+        body = Group(Text(content[:split]), Markdown(content[split:]))
+    return Panel(body, title="[bold cyan]Robot[/bold cyan]", border_style="cyan", style="black on white")
+
+def _render_stream(live, events: "queue.Queue") -> None:
+    """Consumes chat events off the queue and redraws the Live view at most every RENDER_INTERVAL."""
+    from rich.spinner import Spinner
+
+    parts = []
+    dirty = False
+    last_frame = 0.0
+    while True:
+        try:
+            item = events.get(timeout=RENDER_INTERVAL)
+        except queue.Empty:
+            item = None
+        if item is _END_OF_STREAM:
+            break
+        
+        if item is not None:
+            kind, value = item
+            if kind == "status":
+                live.update(Spinner("dots", text=f"[blue]{value}[/blue]", style="cyan"))
+            elif kind == "reset":
+                # The backend discarded what it streamed so far and is starting over
+                parts.clear()
+                dirty = False
+            else:
+                parts.append(value)
+                dirty = True
+        
+        now = time.monotonic()
+        if dirty and now - last_frame >= RENDER_INTERVAL:
+            live.update(_robot_panel("".join(parts)))
+            last_frame = now
+            dirty = False
+    
+    if parts:
+        live.update(_robot_panel("".join(parts), final=True))
+
+def interactive_session(model: str, resume: bool = False, save_history: bool = True):
+    # Only chat mode renders live output; keep these off the `models` startup path
+    from rich.live import Live
+    from rich.spinner import Spinner
+
+    bot = None
     try:
         api_key = get_api_key()
         if not api_key:
             console.print("[error]API Key is required to proceed.[/error]")
             return
 
-        bot = RobotBackend(api_key=api_key, model=model)
+        bot = RobotBackend(
+            api_key=api_key,
+            model=model,
+            history_path=application_path / ".robotcli_history.jsonl" if save_history else None,
+            resume=resume,
+        )
         
         welcome_text = f"[bold cyan]RobotCLI V2[/bold cyan]\n[dim]System Intelligence Online[/dim]\nInitialized with [blue]{model}[/blue].\nType 'exit' or 'quit' to stop."
         console.print(Panel(welcome_text, title="Welcome", border_style="cyan"))
@@ -70,21 +168,26 @@ def interactive_session(model: str):
                 if user_input.lower() in ["exit", "quit"]:
                     global SHOULD_AUTO_CLOSE
                     SHOULD_AUTO_CLOSE = True
-                    console.print("\n[bold cyan]Goodbye! Closing in 3 seconds...[/bold cyan]")
-                    time.sleep(3)
+                    console.print("\n[bold cyan]Goodbye![/bold cyan]")
+                    countdown_close(3)
                     break
                 
                 with Live(Spinner("bouncingBall", text="[cyan]Processing...[/cyan]", style="cyan"), refresh_per_second=10, console=console) as live:
-                    response_generator = bot.chat_step(user_input)
-                    
-                    final_content = ""
-                    for step in response_generator:
-                        if step["type"] == "status":
-                            live.update(Spinner("dots", text=f"[blue]{step['value']}[/blue]", style="cyan"))
-                        elif step["type"] == "content":
-                            final_content += step["value"]
-                            live.update(Panel(Markdown(final_content), title="[bold cyan]Robot[/bold cyan]", border_style="cyan", style="black on white"))
-
+                    # Rendering runs on its own thread so Markdown parsing never stalls token ingestion
+                    events = queue.Queue()
+                    renderer = threading.Thread(target=_render_stream, args=(live, events), daemon=True)
+                    renderer.start()
+                    try:
+                        for step in bot.chat_step(user_input):
+                            if step["type"] == "status":
+                                events.put(("status", step["value"]))
+                            elif step["type"] == "reset":
+                                events.put(("reset", None))
+                            elif step["type"] in ("content", "content_delta"):
+                                events.put(("content", step["value"]))
+                    finally:
+                        events.put(_END_OF_STREAM)
+                        renderer.join()
 
             except KeyboardInterrupt:
                 console.print("\n[warning]Exiting...[/warning]")
@@ -95,25 +198,30 @@ def interactive_session(model: str):
     except Exception as e:
          console.print(f"[error]Fatal Error:[/error] {e}")
     finally:
+        # Flushes the session log even when the session died on an error
+        if bot is not None:
+            bot.close()
         console.print("\n[dim]Session ended.[/dim]")
         # Removed redundant wait here, handled in __main__
 
 
 @app.command()
 def start(
-    model: str = typer.Option("google/gemini-2.0-flash-001", help="Initial model to use")
+    model: str = typer.Option("google/gemini-2.0-flash-001", help="Initial model to use"),
+    resume: bool = typer.Option(False, "--resume", help="Resume the previous session's conversation"),
+    no_history: bool = typer.Option(False, "--no-history", help="Don't write the conversation to disk and keep the previous log untouched")
 ):
     """Start the interactive RobotCLI chat session."""
-    interactive_session(model)
+    interactive_session(model, resume, save_history=not no_history)
 
 @app.command()
 def models():
     """List available models from OpenRouter."""
+    bot = None
     try:
         api_key = get_api_key()
         if not api_key:
-            if getattr(sys, 'frozen', False):
-                input("\nPress Enter to close...")
+            wait_before_close("\nPress Enter to close...")
             return
             
         bot = RobotBackend(api_key=api_key)
@@ -124,8 +232,10 @@ def models():
     except Exception as e:
         console.print(f"[error]Error checking models:[/error] {e}")
     finally:
-        if getattr(sys, 'frozen', False):
-            input("\nPress Enter to close...")
+        # Releases the HTTP/2 pool and the speculation thread
+        if bot is not None:
+            bot.close()
+        wait_before_close("\nPress Enter to close...")
 
 if __name__ == "__main__":
     # If double-clicked (no args), default to 'start' command
@@ -145,5 +255,5 @@ if __name__ == "__main__":
          console.print(f"[error]System Error: {e}[/error]")
          console.print(f"[warning]Log written to {log_file}[/warning]")
     finally:
-        if getattr(sys, 'frozen', False) and not SHOULD_AUTO_CLOSE:
-            input("\nPress Enter to close this window...")
+        if not SHOULD_AUTO_CLOSE:
+            wait_before_close("\nPress Enter to close this window...")
@@ -0,0 +1,241 @@
+import unittest
+from unittest import mock
+import threading
+import time
+import tempfile
+import shutil
+from pathlib import Path
+from types import SimpleNamespace as NS
+import backend
+from backend import RobotBackend
+
+def run_to_end(gen):
+    """Consumes a chat generator, returning (yielded events, return value)."""
+    events = []
+    while True:
+        try:
+            events.append(next(gen))
+        except StopIteration as stop:
+            return events, stop.value
+
+def tool_call(call_id, name, arguments="{}"):
+    return {"id": call_id, "type": "function", "function": {"name": name, "arguments": arguments}}
+
+def chunk(content=None, tool_calls=None, usage=None):
+    """One streamed ChatCompletionChunk, shaped like the SDK's objects."""
+    delta = NS(content=content, tool_calls=tool_calls)
+    return NS(usage=usage, choices=[NS(delta=delta)])
+
+def tool_fragment(index, id=None, name=None, arguments=None):
+    return NS(index=index, id=id, function=NS(name=name, arguments=arguments))
+
+class FakeCompletions:
+    """Replays one scripted chunk list per create() call and records the requests."""
+    def __init__(self, streams):
+        self.streams = list(streams)
+        self.requests = []
+
+    def create(self, **kwargs):
+        self.requests.append(kwargs)
+        return iter(self.streams.pop(0))
+
+def fake_client(*streams):
+    return NS(chat=NS(completions=FakeCompletions(streams)))
+
+class TestRobotBackend(unittest.TestCase):
+    def setUp(self):
+        self.bot = RobotBackend(api_key="test-key")
+        self.addCleanup(self.bot.close)
+
+    def test_side_effect_tools_run_in_order(self):
+        order = []
+        def make_directory(path):
+            time.sleep(0.05)  # a concurrent move_file would overtake this
+            order.append("make_directory")
+            return "Directory created"
+        def move_file(source, destination):
+            order.append("move_file")
+            return "Moved"
+
+        calls = [
+            tool_call("1", "make_directory", '{"path": "Archive"}'),
+            tool_call("2", "move_file", '{"source": "report.pdf", "destination": "Archive"}'),
+        ]
+        with mock.patch.dict(backend.TOOL_REGISTRY, make_directory=make_directory, move_file=move_file):
+            _, results = run_to_end(self.bot._run_tool_calls(calls, None))
+        self.assertEqual(order, ["make_directory", "move_file"])
+        self.assertEqual(results, {"1": "Directory created", "2": "Moved"})
+
+    def test_read_only_tools_overlap(self):
+        # Both calls must be in flight at once to get past the barrier
+        barrier = threading.Barrier(2, timeout=5)
+        def list_directory(path):
+            barrier.wait()
+            return f"listing of {path}"
+
+        calls = [
+            tool_call("a", "list_directory", '{"path": "downloads"}'),
+            tool_call("b", "list_directory", '{"path": "documents"}'),
+        ]
+        with mock.patch.dict(backend.TOOL_REGISTRY, list_directory=list_directory):
+            _, results = run_to_end(self.bot._run_tool_calls(calls, None))
+        self.assertEqual(results, {"a": "listing of downloads", "b": "listing of documents"})
+
+    def test_tool_subset_keeps_a_floor(self):
+        self.bot.tool_usage.update({"disk_usage": 2})
+        for _ in range(backend.TOOL_SPECIALIZE_AFTER_TURNS + 1):
+            tools = self.bot._select_tools()
+        names = [t["function"]["name"] for t in tools]
+        self.assertEqual(names[-1], backend.MORE_TOOLS_NAME)
+        self.assertGreaterEqual(len(names) - 1, backend.TOOL_MIN_ACTIVE)
+        self.assertIn("disk_usage", names)
+
+    def test_more_tools_retry_resets_streamed_text(self):
+        self.bot.client = fake_client(
+            [chunk(content="Let me check."), chunk(tool_calls=[tool_fragment(0, "s1", backend.MORE_TOOLS_NAME, "{}")])],
+            [chunk(content="Let me check."), chunk(content=" Done.")],
+        )
+        events = list(self.bot.chat_step("hello"))
+        # Text shown before the reset is dropped by the UI; only the retry's text survives
+        reset = [e["type"] for e in events].index("reset")
+        shown = "".join(e["value"] for e in events[reset + 1:] if e["type"] == "content_delta")
+        self.assertEqual(shown, "Let me check. Done.")
+        self.assertEqual(self.bot.history[-1], {"role": "assistant", "content": "Let me check. Done."})
+
+    def test_stream_assembles_tool_call_fragments(self):
+        self.bot.client = fake_client([
+            chunk(content="Checking"),
+            chunk(tool_calls=[tool_fragment(0, "c1", "read_", '{"pa')]),
+            chunk(tool_calls=[tool_fragment(0, None, "file", 'th": "a.txt"}'), tool_fragment(1, "c2", "disk_usage", "")]),
+            chunk(tool_calls=[tool_fragment(1, None, None, "{}")]),
+            NS(usage=NS(prompt_tokens=10, prompt_tokens_details=None), choices=[]),  # include_usage trailer
+        ])
+        events, message = run_to_end(self.bot._stream_completion(model="m", messages=[]))
+        self.assertEqual(events, [{"type": "content_delta", "value": "Checking"}])
+        self.assertEqual(message["content"], "Checking")
+        self.assertEqual(message["tool_calls"], [
+            tool_call("c1", "read_file", '{"path": "a.txt"}'),
+            tool_call("c2", "disk_usage", "{}"),
+        ])
+        self.assertEqual(self.bot.client.chat.completions.requests[0]["stream_options"], {"include_usage": True})
+
+    def test_reply_after_tool_preamble_is_separated(self):
+        self.bot.direct_render = False
+        self.bot.client = fake_client(
+            [chunk(content="Let me check that."), chunk(tool_calls=[tool_fragment(0, "c1", "disk_usage", "{}")])],
+            [chunk(content="Here are the results.")],
+        )
+        with mock.patch.dict(backend.TOOL_REGISTRY, disk_usage=lambda: "C: 10 GB free"):
+            events = list(self.bot.chat_step("how much space is left?"))
+        shown = "".join(e["value"] for e in events if e["type"] in ("content", "content_delta"))
+        self.assertEqual(shown, "Let me check that.\n\nHere are the results.")
+
+    def test_direct_render_after_tool_preamble_is_separated(self):
+        self.bot.client = fake_client(
+            [chunk(content="Checking:"), chunk(tool_calls=[tool_fragment(0, "c1", "disk_usage", "{}")])],
+        )
+        with mock.patch.dict(backend.TOOL_REGISTRY, disk_usage=lambda: "C: 10 GB free"):
+            events = list(self.bot.chat_step("hello"))
+        shown = "".join(e["value"] for e in events if e["type"] in ("content", "content_delta"))
+        self.assertTrue(shown.startswith("Checking:\n\n**Disk Usage**"), shown)
+
+    def _fill_history(self, turns, size):
+        for i in range(turns):
+            self.bot.history.extend([
+                {"role": "user", "content": f"turn {i} " + "x" * size},
+                {"role": "assistant", "content": None, "tool_calls": [tool_call(f"t{i}", "disk_usage")]},
+                {"role": "tool", "tool_call_id": f"t{i}", "name": "disk_usage", "content": "C: 10 GB free"},
+                {"role": "assistant", "content": f"answer {i}"},
+            ])
+
+    def test_compaction_drops_old_tool_traffic(self):
+        self._fill_history(turns=4, size=10)
+        system = self.bot.history[0]
+        self.bot._compact_history()
+        self.assertIs(self.bot.history[0], system)
+        tool_messages = [m for m in self.bot.history if m.get("role") == "tool"]
+        self.assertEqual([m["tool_call_id"] for m in tool_messages], ["t2", "t3"])
+        self.assertEqual(len([m for m in self.bot.history if m["role"] == "user"]), 4)
+
+    def test_compaction_summarizes_past_the_budget(self):
+        self._fill_history(turns=10, size=backend.HISTORY_CHAR_BUDGET // 8)
+        with mock.patch.object(self.bot, "_summarize", return_value="earlier stuff") as summarize:
+            self.bot._compact_history()
+        summarize.assert_called_once()
+        self.assertEqual(self.bot.history[1], {"role": "system", "content": "Summary of earlier conversation: earlier stuff"})
+        users = [m["content"] for m in self.bot.history if m["role"] == "user"]
+        self.assertEqual(len(users), backend.KEEP_RECENT_TURNS)
+        self.assertTrue(users[0].startswith("turn 4 "))
+
+    def test_compaction_without_summary_keeps_recent_turns(self):
+        self._fill_history(turns=10, size=backend.HISTORY_CHAR_BUDGET // 8)
+        with mock.patch.object(self.bot, "_summarize", side_effect=RuntimeError("offline")):
+            self.bot._compact_history()
+        self.assertEqual(self.bot.history[1]["role"], "user")
+        self.assertEqual(len([m for m in self.bot.history if m["role"] == "user"]), backend.KEEP_RECENT_TURNS)
+
+class TestSpeculation(unittest.TestCase):
+    def test_predicts_only_specific_intents(self):
+        expected = {
+            "show my downloads": ("list_directory", {"path": "downloads"}),
+            "List Documents folder.": ("list_directory", {"path": "documents"}),
+            "what's my CPU usage?": ("check_resources", {}),
+            "how much free space do I have": ("disk_usage", {}),
+            "show the running processes": ("list_processes", {}),
+            "process these files in downloads": None,
+            "copy the USB drive contents to desktop": None,
+            "show me the pdfs in downloads": None,
+            "free up some memory": None,
+        }
+        for text, prediction in expected.items():
+            with self.subTest(text=text):
+                self.assertEqual(backend._predict_tool(text), prediction)
+
+class TestSessionLog(unittest.TestCase):
+    def test_unwritable_log_does_not_stop_startup(self):
+        folder = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, folder)
+        missing_dir = folder / "gone"
+        bot = RobotBackend(api_key="test-key", history_path=missing_dir / "history.jsonl")
+        self.addCleanup(bot.close)
+        self.assertIsNone(bot._log_fd)
+        bot._append({"role": "user", "content": "hi"})
+        self.assertEqual(bot.history[-1]["content"], "hi")
+
+    def test_resume_reloads_logged_turns(self):
+        folder = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, folder)
+        path = folder / "history.jsonl"
+        bot = RobotBackend(api_key="test-key", history_path=path)
+        bot._append({"role": "user", "content": "hi"})
+        bot._append({"role": "assistant", "content": "hello"})
+        bot.close()
+
+        resumed = RobotBackend(api_key="test-key", history_path=path, resume=True)
+        self.addCleanup(resumed.close)
+        self.assertEqual([m["content"] for m in resumed.history[1:]], ["hi", "hello"])
+
+    def test_resume_drops_unanswered_tool_calls(self):
+        folder = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, folder)
+        path = folder / "history.jsonl"
+        bot = RobotBackend(api_key="test-key", history_path=path)
+        for message in (
+            {"role": "user", "content": "disk?"},
+            {"role": "assistant", "content": None, "tool_calls": [tool_call("t1", "disk_usage")]},
+            {"role": "tool", "tool_call_id": "t1", "name": "disk_usage", "content": "C: 10 GB free"},
+            {"role": "assistant", "content": "10 GB free"},
+            {"role": "user", "content": "and processes?"},
+            # Crash here: the results for t2/t3 were never logged
+            {"role": "assistant", "content": None, "tool_calls": [tool_call("t2", "list_processes"), tool_call("t3", "check_resources")]},
+            {"role": "tool", "tool_call_id": "t2", "name": "list_processes", "content": "python: 10 MB"},
+        ):
+            bot._append(message)
+        bot.close()
+
+        resumed = RobotBackend(api_key="test-key", history_path=path, resume=True)
+        self.addCleanup(resumed.close)
+        self.assertEqual([m["role"] for m in resumed.history[1:]], ["user", "assistant", "tool", "assistant", "user"])
+
+if __name__ == "__main__":
+    unittest.main()
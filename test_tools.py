@@ -1,7 +1,13 @@
 import unittest
-from tools import find_files, manage_files, git_manager
+from unittest import mock
+import tools
+from tools import search_files, manage_files, git_manager, find_duplicates, read_file, rename_file, copy_file, write_to_file, zip_folder, get_file_info, extract_archive
 import os
 import shutil
+import subprocess
+import tempfile
+import zipfile
+import threading
 from pathlib import Path
 
 class TestRobotTools(unittest.TestCase):
@@ -17,11 +23,12 @@ class TestRobotTools(unittest.TestCase):
         if self.test_dir.exists():
             shutil.rmtree(self.test_dir)
 
-    def test_find_files(self):
+    def test_search_files(self):
         # We need to search in our test_dir, manage_files allows generic paths or defaults to Docs
-        # find_files defaults to Documents but accepts search_path
-        results = find_files("test_file", search_path=str(self.test_dir))
-        self.assertTrue(any("test_file.txt" in r for r in results))
+        # search_files defaults to Documents but accepts search_path
+        results = search_files("test_file", search_path=str(self.test_dir))
+        self.assertEqual(results.splitlines(), [str((self.test_dir / "test_file.txt").resolve())])
+        self.assertEqual(search_files("nothing-like-this", search_path=str(self.test_dir)), "No matching files found.")
 
     def test_manage_files_copy(self):
         src = str(self.test_dir / "test_file.txt")
@@ -29,16 +36,164 @@ class TestRobotTools(unittest.TestCase):
         manage_files("copy", [src], target)
         self.assertTrue((Path(target) / "test_file.txt").exists())
 
+    def test_copy_file(self):
+        src = self.test_dir / "test_file.txt"
+        result = copy_file(str(src), str(self.test_dir / "sub"))
+        self.assertIn("Copied to", result)
+        self.assertEqual((self.test_dir / "sub" / "test_file.txt").read_text(), "hello")
+
+    def test_copy_file_onto_itself_keeps_source(self):
+        src = self.test_dir / "test_file.txt"
+        for destination in (src, self.test_dir):
+            result = copy_file(str(src), str(destination))
+            self.assertIn("same file", result)
+            self.assertEqual(src.read_text(), "hello")
+
+    def test_write_to_file_overwrites(self):
+        target = self.test_dir / "test_file.txt"
+        self.assertIn("File written", write_to_file(str(target), "replaced"))
+        self.assertEqual(target.read_text(), "replaced")
+
+    def test_zip_folder_modes(self):
+        expected = {"test_file.txt": b"hello", "sub/other.pdf": b"fake pdf"}
+        for mode, compression in (("store", zipfile.ZIP_STORED), ("deflate", zipfile.ZIP_DEFLATED), ("lzma", zipfile.ZIP_LZMA)):
+            with self.subTest(mode=mode):
+                out = Path(tempfile.mkdtemp())
+                self.addCleanup(shutil.rmtree, out)
+                result = zip_folder(str(self.test_dir), str(out / "backup.2024"), mode=mode)
+                archive = out / "backup.2024.zip"
+                self.assertIn(str(archive), result)
+                with zipfile.ZipFile(archive) as zf:
+                    self.assertEqual({i.filename: zf.read(i) for i in zf.infolist()}, expected)
+                    self.assertTrue(all(i.compress_type == compression for i in zf.infolist()))
+
+    @unittest.skipIf(tools.zstandard is None, "zstandard not installed")
+    def test_zip_folder_zstd_round_trip(self):
+        out = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, out)
+        result = zip_folder(str(self.test_dir), str(out / "backup"), mode="zstd")
+        archive = out / "backup.tar.zst"
+        self.assertIn(str(archive), result)
+        self.assertIn("Extracted", extract_archive(str(archive), str(out / "restored")))
+        self.assertEqual((out / "restored" / "test_file.txt").read_text(), "hello")
+        self.assertEqual((out / "restored" / "sub" / "other.pdf").read_text(), "fake pdf")
+
+    def test_zip_folder_unknown_mode(self):
+        self.assertIn("unknown mode", zip_folder(str(self.test_dir), str(self.test_dir / "x.zip"), mode="rar"))
+
+    @unittest.skipIf(os.name == "nt", "POSIX permission semantics")
+    def test_get_file_info_read_only(self):
+        target = self.test_dir / "test_file.txt"
+        self.assertIn("Read-Only: False", get_file_info(str(target)))
+        os.chmod(target, 0o444)
+        # root can still write a 0444 file
+        self.assertIn(f"Read-Only: {os.geteuid() != 0}", get_file_info(str(target)))
+
+    def test_read_file_truncation(self):
+        cases = {
+            "short.txt": ("hello", "hello"),
+            "exact.txt": ("a" * 2000, "a" * 2000),
+            "long.txt": ("b" * 3000, "b" * 2000 + "..."),
+            # 2 bytes per character: the 8 KiB read still covers the 2000 characters shown
+            "wide.txt": ("\u00e9" * 5000, "\u00e9" * 2000 + "..."),
+        }
+        for name, (content, expected) in cases.items():
+            with self.subTest(name=name):
+                (self.test_dir / name).write_text(content, encoding="utf-8")
+                self.assertEqual(read_file(str(self.test_dir / name)), expected)
+
+    def test_full_hash_skips_file_changed_since_scan(self):
+        # Bucketed at 100 KB, then truncated to 0 before hashing: skipped, not a failed scan
+        emptied = self.test_dir / "emptied.bin"
+        emptied.write_bytes(b"")
+        self.assertIsNone(tools._try_hash_full((str(emptied), 100 * 1024)))
+
+    def test_find_duplicates(self):
+        (self.test_dir / "copy.txt").write_text("hello")
+        (self.test_dir / "other.txt").write_text("world")
+        result = find_duplicates(str(self.test_dir))
+        self.assertIn("copy.txt", result)
+        self.assertIn("test_file.txt", result)
+        self.assertNotIn("other.txt", result)
+
+    def test_resolve_sees_file_created_later(self):
+        # A relative path that was missing from Home must not stay "not found" once it is created
+        home = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, home)
+        with mock.patch.object(tools, "_HOME", home):
+            self.assertEqual(read_file("later.txt"), "Error: Not found.")
+            (home / "later.txt").write_text("now here")
+            self.assertEqual(read_file("later.txt"), "now here")
+
+    def test_resolve_after_rename(self):
+        folder = self.test_dir / "old_name"
+        folder.mkdir()
+        (folder / "inner.txt").write_text("inside")
+        self.assertEqual(read_file(str(folder / "inner.txt")), "inside")
+        rename_file(str(folder), "new_name")
+        self.assertEqual(read_file(str(folder / "inner.txt")), "Error: Not found.")
+        self.assertEqual(read_file(str(self.test_dir / "new_name" / "inner.txt")), "inside")
+
+    def test_invalidate_paths_during_concurrent_resolves(self):
+        # Tool calls run on worker threads, so invalidation must not race the cache writers
+        root = self.test_dir.resolve()
+        errors = []
+        def resolve():
+            for i in range(5000):
+                tools._resolve_cached(root / f"d{i % 200}" / "f.txt")
+        def invalidate():
+            for _ in range(500):
+                try:
+                    tools._invalidate_paths(root / "d1")
+                except RuntimeError as e:
+                    errors.append(e)
+        threads = [threading.Thread(target=resolve) for _ in range(3)] + [threading.Thread(target=invalidate)]
+        for t in threads: t.start()
+        for t in threads: t.join()
+        self.assertEqual(errors, [])
+
+    def test_find_duplicates_large_files(self):
+        # Over the 64 KiB prefix, so these go through the threaded full-file hash
+        big = os.urandom(200 * 1024)
+        (self.test_dir / "big_a.bin").write_bytes(big)
+        (self.test_dir / "sub" / "big_b.bin").write_bytes(big)
+        # Same size and same first 64 KiB, different tail
+        (self.test_dir / "big_c.bin").write_bytes(big[:-1] + bytes([big[-1] ^ 0xFF]))
+
+        backends = {
+            "installed": {"xxhash": tools.xxhash, "blake3": tools.blake3},
+            "hashlib": {"xxhash": None, "blake3": None},
+        }
+        for name, overrides in backends.items():
+            with self.subTest(backend=name), mock.patch.multiple(tools, **overrides):
+                lines = find_duplicates(str(self.test_dir)).splitlines()
+                pairs = [line for line in lines if "big_" in line]
+                self.assertEqual(len(pairs), 1)
+                self.assertIn("big_a.bin", pairs[0])
+                self.assertIn("big_b.bin", pairs[0])
+
     def test_git_manager_init(self):
         # Test git init in a safe temp dir
         repo_dir = self.test_dir / "repo"
         repo_dir.mkdir()
         (repo_dir / "code.py").write_text("print('hi')")
         
-        # We won't push, just init and commit
-        result = git_manager(str(repo_dir))
-        self.assertIn("Git operations successful", result)
+        # We won't push, just init. Committing needs an identity, covered below
+        git_manager(str(repo_dir))
         self.assertTrue((repo_dir / ".git").exists())
 
+    def test_git_manager_commit(self):
+        repo_dir = self.test_dir / "repo"
+        repo_dir.mkdir()
+        (repo_dir / "code.py").write_text("print('hi')")
+        subprocess.run(["git", "init", "-q"], cwd=repo_dir, check=True)
+        subprocess.run(["git", "config", "user.name", "Test"], cwd=repo_dir, check=True)
+        subprocess.run(["git", "config", "user.email", "test@example.com"], cwd=repo_dir, check=True)
+
+        result = git_manager(str(repo_dir), commit_message="First")
+        self.assertIn("Git operations ran", result)
+        log = subprocess.run(["git", "log", "--format=%an %s"], cwd=repo_dir, capture_output=True, text=True)
+        self.assertEqual(log.stdout.strip(), "Test First")
+
 if __name__ == "__main__":
     unittest.main()
@@ -1,42 +1,224 @@
 import os
+import sys
+import stat
+import ctypes
+import functools
 import shutil
 import subprocess
+import threading
 import time
 import hashlib
+import heapq
+import mmap
 import psutil
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
 import send2trash
+import tarfile
 import zipfile
 from pathlib import Path
-from typing import List, Optional, Dict, Union
+from typing import List, Optional, Dict, Union, Iterator, Tuple, NamedTuple
+
+# Optional: multi-threaded zstd for zip_folder(mode="zstd")
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# xxh3_128 (required) is the duplicate-detection hash: it runs at memory bandwidth, and
+# duplicate detection needs uniformity, not collision resistance.
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
+
+# Fallbacks for source installs without xxhash: BLAKE3 if it happens to be installed
+# (not pinned or bundled), else hashlib.
+try:
+    import blake3
+except ImportError:
+    blake3 = None
 
 # --- Helpers ---
 
+_HOME = Path(os.path.expanduser("~"))
+
+COMMON_DIRS = {
+    "downloads": "Downloads",
+    "documents": "Documents",
+    "desktop": "Desktop",
+    "music": "Music",
+    "pictures": "Pictures",
+    "videos": "Videos"
+}
+
+# Ancestor-aware resolve cache: absolute input path -> resolved Path, for every directory
+# walked on the way to a leaf. Once a parent is cached, resolving a new child costs one lstat.
+_RESOLVED_DIRS: Dict[str, Path] = {}
+_RESOLVED_DIRS_MAX = 8192
+# Tools run on worker threads; every read and write of _RESOLVED_DIRS holds this lock
+_RESOLVED_LOCK = threading.Lock()
+
+def _is_link(path: str) -> bool:
+    if os.path.islink(path):
+        return True
+    isjunction = getattr(os.path, "isjunction", None)  # Windows junctions, Python 3.12+
+    return bool(isjunction and isjunction(path))
+
+def _resolve_cached(p: Path) -> Path:
+    """Path.resolve() equivalent that caches each resolved ancestor."""
+    if not p.is_absolute():
+        p = Path(os.getcwd()) / p
+    key = str(p)
+    with _RESOLVED_LOCK:
+        hit = _RESOLVED_DIRS.get(key)
+    if hit is not None:
+        return hit
+    
+    parent = p.parent
+    if parent == p:
+        resolved = p.resolve()  # anchor: '/', 'C:\\', UNC share
+    elif p.name == "..":
+        resolved = _resolve_cached(parent).parent
+    else:
+        leaf = _resolve_cached(parent) / p.name
+        resolved = leaf.resolve() if _is_link(str(leaf)) else leaf
+    
+    with _RESOLVED_LOCK:
+        if len(_RESOLVED_DIRS) >= _RESOLVED_DIRS_MAX:
+            _RESOLVED_DIRS.clear()
+        _RESOLVED_DIRS[key] = resolved
+    return resolved
+
+def _path_under(path: str, prefix: str) -> bool:
+    return path == prefix or path.startswith(prefix.rstrip(os.sep) + os.sep)
+
+def _invalidate_paths(*paths: Path):
+    """Drops cached resolutions at or below paths after they were renamed, moved or deleted."""
+    prefixes = [str(p) for p in paths]
+    with _RESOLVED_LOCK:
+        stale = [k for k, v in _RESOLVED_DIRS.items()
+                 if any(_path_under(k, pre) or _path_under(str(v), pre) for pre in prefixes)]
+        for k in stale:
+            del _RESOLVED_DIRS[k]
+
 def get_documents_dir() -> Path:
-    return Path(os.path.expanduser("~")) / "Documents"
+    return _HOME / "Documents"
 
 def _resolve_path(path_str: str) -> Path:
     """Helper to resolve paths safely, handling common synonyms."""
     clean_path = path_str.strip().lower()
-    common_dirs = {
-        "downloads": "Downloads",
-        "documents": "Documents",
-        "desktop": "Desktop",
-        "music": "Music",
-        "pictures": "Pictures",
-        "videos": "Videos"
-    }
-    
-    if clean_path in common_dirs:
-         return Path(os.path.expanduser("~")) / common_dirs[clean_path]
+    if clean_path in COMMON_DIRS:
+         return _HOME / COMMON_DIRS[clean_path]
     
     p = Path(path_str)
-    # If it's a relative path, try to see if it exists in Home first (more likely intent)
+    # If it's a relative path, try to see if it exists in Home first (more likely intent).
+    # Never cached: the answer changes as soon as the file is created.
     if not p.is_absolute():
-        home_variant = Path(os.path.expanduser("~")) / path_str
+        home_variant = _HOME / path_str
         if home_variant.exists():
             return home_variant
-            
-    return p.resolve()
+    
+    return _resolve_cached(p)
+
+# POSIX: scan each directory through an open fd so DirEntry.stat() is an fstatat relative
+# to it, instead of the kernel re-resolving the full path for every file.
+_SCANDIR_FD = os.scandir in os.supports_fd and hasattr(os, "O_DIRECTORY")
+
+def _iter_files(root: Union[str, Path]) -> Iterator[Tuple[os.DirEntry, str]]:
+    """Recursively yields (DirEntry, parent directory) for files using os.scandir.
+    
+    Callers join the full path themselves, only for entries they keep. Call entry.stat()
+    before advancing the iterator: on POSIX the directory fd it is relative to is closed
+    once that directory has been fully read.
+    """
+    stack = [str(root)]
+    while stack:
+        current = stack.pop()
+        try:
+            fd = os.open(current, os.O_RDONLY | os.O_DIRECTORY) if _SCANDIR_FD else None
+        except OSError:
+            continue
+        try:
+            with os.scandir(current if fd is None else fd) as it:
+                for entry in it:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(os.path.join(current, entry.name))
+                        elif entry.is_file(follow_symlinks=False):
+                            yield entry, current
+                    except OSError:
+                        pass
+        except OSError:
+            pass
+        finally:
+            if fd is not None:
+                os.close(fd)
+
+# --- statx (Linux) ---
+# statx(AT_STATX_DONT_SYNC) returns cached metadata without forcing a sync on network/FUSE
+# mounts and fetches only the requested fields. Falls back to os.stat everywhere else.
+
+class _StatxTimestamp(ctypes.Structure):
+    _fields_ = [("tv_sec", ctypes.c_int64), ("tv_nsec", ctypes.c_uint32), ("_reserved", ctypes.c_int32)]
+
+class _Statx(ctypes.Structure):
+    _fields_ = [
+        ("stx_mask", ctypes.c_uint32), ("stx_blksize", ctypes.c_uint32),
+        ("stx_attributes", ctypes.c_uint64),
+        ("stx_nlink", ctypes.c_uint32), ("stx_uid", ctypes.c_uint32), ("stx_gid", ctypes.c_uint32),
+        ("stx_mode", ctypes.c_uint16), ("_spare0", ctypes.c_uint16),
+        ("stx_ino", ctypes.c_uint64), ("stx_size", ctypes.c_uint64), ("stx_blocks", ctypes.c_uint64),
+        ("stx_attributes_mask", ctypes.c_uint64),
+        ("stx_atime", _StatxTimestamp), ("stx_btime", _StatxTimestamp),
+        ("stx_ctime", _StatxTimestamp), ("stx_mtime", _StatxTimestamp),
+        ("stx_rdev_major", ctypes.c_uint32), ("stx_rdev_minor", ctypes.c_uint32),
+        ("stx_dev_major", ctypes.c_uint32), ("stx_dev_minor", ctypes.c_uint32),
+        ("_spare2", ctypes.c_uint64 * 14),
+    ]
+
+_AT_FDCWD = -100
+_AT_STATX_DONT_SYNC = 0x4000
+_STATX_TYPE = 0x1
+_STATX_MODE = 0x2
+_STATX_CTIME = 0x80
+_STATX_SIZE = 0x200
+
+class _StatInfo(NamedTuple):
+    st_mode: int
+    st_size: int
+    st_ctime: float
+
+@functools.lru_cache(maxsize=1)
+def _statx_func():
+    """One-shot probe for glibc's statx wrapper (glibc 2.28+, Linux 4.11+)."""
+    if sys.platform != "linux":
+        return None
+    try:
+        func = ctypes.CDLL(None, use_errno=True).statx
+    except (OSError, AttributeError):
+        return None
+    func.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_int, ctypes.c_uint, ctypes.POINTER(_Statx)]
+    func.restype = ctypes.c_int
+    buf = _Statx()
+    if func(_AT_FDCWD, b"/", _AT_STATX_DONT_SYNC, _STATX_TYPE, ctypes.byref(buf)) != 0:
+        return None  # ENOSYS on kernels older than 4.11
+    return func
+
+def _stat_info(path: Union[str, Path]) -> _StatInfo:
+    """Mode, size and ctime of path, via statx on Linux and os.stat elsewhere."""
+    func = _statx_func()
+    if func is None:
+        st = os.stat(path)
+        return _StatInfo(st.st_mode, st.st_size, st.st_ctime)
+    
+    buf = _Statx()
+    mask = _STATX_TYPE | _STATX_MODE | _STATX_SIZE | _STATX_CTIME
+    if func(_AT_FDCWD, os.fsencode(path), _AT_STATX_DONT_SYNC, mask, ctypes.byref(buf)) != 0:
+        err = ctypes.get_errno()
+        raise OSError(err, os.strerror(err), str(path))
+    ctime = buf.stx_ctime.tv_sec + buf.stx_ctime.tv_nsec / 1e9
+    return _StatInfo(buf.stx_mode, buf.stx_size, ctime)
 
 # --- 1. Basic File Actions ---
 
@@ -61,12 +243,14 @@ def delete_file(path: str, safe: bool = True) -> str:
         
         if safe:
             send2trash.send2trash(str(p))
+            _invalidate_paths(p)
             return f"Moved to Recycle Bin: {path}"
         else:
             if p.is_dir():
                 shutil.rmtree(p)
             else:
                 os.remove(p)
+            _invalidate_paths(p)
             return f"Permanently deleted: {path}"
     except Exception as e:
         return f"Error deleting file: {e}"
@@ -79,6 +263,7 @@ def rename_file(path: str, new_name: str) -> str:
             return f"Error: File {path} not found."
         new_path = p.parent / new_name
         p.rename(new_path)
+        _invalidate_paths(p, new_path)
         return f"Renamed to: {new_path}"
     except Exception as e:
         return f"Error renaming file: {e}"
@@ -87,13 +272,19 @@ def get_file_info(path: str) -> str:
     """Returns size, creation time, and readonly status."""
     try:
         p = _resolve_path(path)
-        if not p.exists():
+        try:
+            info = _stat_info(p)
+        except FileNotFoundError:
             return f"Error: File {path} not found."
         
-        stat = p.stat()
-        created = time.ctime(stat.st_ctime)
-        size_mb = stat.st_size / (1024 * 1024)
-        readonly = not (os.access(p, os.W_OK))
+        created = time.ctime(info.st_ctime)
+        size_mb = info.st_size / (1024 * 1024)
+        if os.name == "nt":
+            # The owner write bit is exactly the read-only attribute; no second call needed
+            readonly = not (info.st_mode & stat.S_IWRITE)
+        else:
+            # POSIX: ownership, group bits and root all matter, so ask the kernel
+            readonly = not os.access(p, os.W_OK)
         
         return f"File: {p.name}\nSize: {size_mb:.2f} MB\nCreated: {created}\nRead-Only: {readonly}"
     except Exception as e:
@@ -119,7 +310,9 @@ def list_directory(path: str) -> str:
         if not p.is_dir():
             return f"Error: {path} is not a directory."
         
-        items = list(p.iterdir())
+        # DirEntry carries the type from the directory read: no Path objects, no stat per item
+        with os.scandir(p) as it:
+            items = list(it)
         details = []
         for item in items[:50]: # limit
             kind = "DIR" if item.is_dir() else "FILE"
@@ -142,22 +335,65 @@ def is_directory(path: str) -> str:
 
 # --- 3. Bulk & Organization ---
 
+SEARCH_MAX_RESULTS = 50
+
+@functools.lru_cache(maxsize=1)
+def _ripgrep() -> Optional[str]:
+    return shutil.which("rg")
+
+def _is_extension_query(query: str) -> bool:
+    """True for queries like '.pdf', which only need a suffix match on the name."""
+    return len(query) > 1 and query.startswith(".") and query[1:].isalnum()
+
+def _search_with_rg(rg: str, query: str, root_dir: Path) -> List[str]:
+    """Lists files whose name contains query using ripgrep's parallel walker."""
+    pattern = f"*{query}" if _is_extension_query(query) else f"*{query}*"
+    # --hidden/--no-ignore keep parity with the Python walk, which skips nothing
+    cmd = [rg, "--files", "--hidden", "--no-ignore", "--iglob", pattern, str(root_dir)]
+    matches = []
+    # LC_ALL=C skips locale-aware case folding setup
+    with subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                          env={**os.environ, "LC_ALL": "C"}) as proc:
+        for line in proc.stdout:
+            matches.append(os.fsdecode(line.rstrip(b"\r\n")))
+            if len(matches) >= SEARCH_MAX_RESULTS:
+                break
+        proc.kill()  # stop walking once we have enough
+    return matches
+
+def _format_matches(matches: List[str]) -> str:
+    # One path per line: str(list) costs the model quotes, commas and doubled Windows backslashes
+    return "\n".join(matches) if matches else "No matching files found."
+
 def search_files(query: str, search_path: Optional[str] = None) -> str:
     """Recursively search for files. Query can be extension (.pdf) or name."""
     root_dir = _resolve_path(search_path) if search_path else get_documents_dir()
+    
+    # Prefer ripgrep when installed; queries with glob metacharacters stay on the Python path
+    rg = _ripgrep()
+    if rg and not any(c in query for c in "*?[]{}\\"):
+        try:
+            return _format_matches(_search_with_rg(rg, query, root_dir))
+        except OSError:
+            pass
+    
     matches = []
     try:
+        q = query.lower()  # hoisted: one lowercase per search, not per file
+        # Extension queries are a suffix test, not a scan of the whole name
+        match = (lambda name: name.endswith(q)) if _is_extension_query(query) else (lambda name: q in name)
         scan_count = 0
-        for root, dirs, files in os.walk(root_dir):
+        for entry, root in _iter_files(root_dir):
+            scan_count += 1
             if scan_count > 10000: break # Safety break
-            for file in files:
-                scan_count += 1
-                if query.lower() in file.lower():
-                    matches.append(os.path.join(root, file))
+            if match(entry.name.lower()):
+                matches.append(os.path.join(root, entry.name))
+                if len(matches) >= SEARCH_MAX_RESULTS:
+                    break  # nothing past the cap is returned, so stop walking
     except Exception as e:
         return f"Error searching: {e}"
     
-    return str(matches[:50])
+    return _format_matches(matches)
 
 def organize_files_by_extension(path: str) -> str:
     """Moves files into subfolders based on extension (e.g. .pdf -> /PDFs)."""
@@ -166,18 +402,28 @@ def organize_files_by_extension(path: str) -> str:
         if not p.is_dir():
             return "Error: Path is not a directory."
         
+        # Snapshot the listing first: entries are renamed out of the directory as we go
+        with os.scandir(p) as it:
+            entries = [e for e in it if e.is_file() and not e.name.startswith(".")]
+        
         moved_count = 0
-        for item in p.iterdir():
-            if item.is_file() and not item.name.startswith("."):
-                ext = item.suffix.lower().strip(".")
-                if not ext: continue
-                
-                # Make folder name (e.g. 'pdfs', 'jpgs')
-                target_folder = p / (ext + "s") 
-                target_folder.mkdir(exist_ok=True)
-                
-                shutil.move(str(item), str(target_folder / item.name))
-                moved_count += 1
+        created = set()
+        for entry in entries:
+            ext = os.path.splitext(entry.name)[1].lower().strip(".")
+            if not ext: continue
+            
+            # Make folder name (e.g. 'pdfs', 'jpgs')
+            target_folder = os.path.join(p, ext + "s")
+            if ext not in created:
+                os.makedirs(target_folder, exist_ok=True)
+                created.add(ext)
+            
+            target = os.path.join(target_folder, entry.name)
+            try:
+                os.rename(entry.path, target)  # same directory tree, so same device
+            except OSError:
+                shutil.move(entry.path, target)
+            moved_count += 1
                 
         return f"Organized {moved_count} files into extension folders."
     except Exception as e:
@@ -194,14 +440,40 @@ def move_file(source: str, destination: str) -> str:
         # If dst is a dir, move into it
         if dst.is_dir():
             shutil.move(str(src), str(dst / src.name))
+            _invalidate_paths(src, dst / src.name)
             return f"Moved {src.name} to {dst}"
         else:
             # Rename/Move to new path
             shutil.move(str(src), str(dst))
+            _invalidate_paths(src, dst)
             return f"Moved to {dst}"
     except Exception as e:
         return f"Error moving: {e}"
 
+# Linux 4.5+: in-kernel copy that reflinks on btrfs/XFS, making CoW copies O(metadata)
+_HAS_COPY_FILE_RANGE = hasattr(os, "copy_file_range")
+COPY_RANGE_CHUNK = 1 << 30
+
+def _copy_file_fast(src: str, dst: str, *, follow_symlinks: bool = True) -> str:
+    """shutil.copy2 replacement (also usable as copytree's copy_function) using copy_file_range."""
+    if not _HAS_COPY_FILE_RANGE or (not follow_symlinks and os.path.islink(src)):
+        return shutil.copy2(src, dst, follow_symlinks=follow_symlinks)
+    if os.path.isdir(dst):
+        dst = os.path.join(dst, os.path.basename(src))
+    # Opening dst for writing truncates it, which would wipe src if they are the same file
+    if os.path.exists(dst) and os.path.samefile(src, dst):
+        raise shutil.SameFileError(f"{src!r} and {dst!r} are the same file")
+    try:
+        with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+            # copy_file_range may return short counts; loop until EOF
+            while os.copy_file_range(fsrc.fileno(), fdst.fileno(), COPY_RANGE_CHUNK):
+                pass
+    except OSError:
+        # EXDEV/EOPNOTSUPP/ENOSYS etc.: let shutil pick the best userspace path
+        return shutil.copy2(src, dst, follow_symlinks=follow_symlinks)
+    shutil.copystat(src, dst, follow_symlinks=follow_symlinks)
+    return dst
+
 def copy_file(source: str, destination: str) -> str:
     """Copies a file or folder from source to destination."""
     try:
@@ -214,28 +486,45 @@ def copy_file(source: str, destination: str) -> str:
         final_dst = dst / src.name if dst.is_dir() else dst
         
         if src.is_dir():
-            shutil.copytree(str(src), str(final_dst))
+            shutil.copytree(str(src), str(final_dst), copy_function=_copy_file_fast)
         else:
-            shutil.copy2(str(src), str(final_dst))
+            _copy_file_fast(str(src), str(final_dst))
         return f"Copied to {final_dst}"
     except Exception as e:
         return f"Error copying: {e}"
 
 # --- 4. Content Manipulation ---
 
+READ_FILE_MAX_CHARS = 2000
+READ_FILE_MAX_BYTES = 8192
+
 def read_file(path: str) -> str:
     """Reads text content (first 2000 chars)."""
     try:
         p = _resolve_path(path)
-        if not p.exists(): return "Error: Not found."
-        text = p.read_text(encoding='utf-8', errors='replace')
-        return text[:2000] + ("..." if len(text)>2000 else "")
+        # Decode only what can be shown: 2000 code points are at most 8000 UTF-8 bytes
+        try:
+            with open(p, "rb") as f:
+                raw = f.read(READ_FILE_MAX_BYTES)
+                truncated = os.fstat(f.fileno()).st_size > len(raw)
+        except FileNotFoundError:
+            return "Error: Not found."
+        text = raw.decode('utf-8', errors='replace')
+        return text[:READ_FILE_MAX_CHARS] + ("..." if truncated or len(text) > READ_FILE_MAX_CHARS else "")
     except Exception as e:
         return f"Error reading file: {e}"
 
 def write_to_file(path: str, content: str) -> str:
-    """Overwrites file content."""
-    return create_file(path, content) # same logic
+    """Overwrites file content, creating the file if needed."""
+    try:
+        p = _resolve_path(path)
+        if p.is_dir():
+            return f"Error: {path} is a directory."
+        p.parent.mkdir(parents=True, exist_ok=True)
+        p.write_text(content, encoding="utf-8")
+        return f"File written: {path}"
+    except Exception as e:
+        return f"Error writing file: {e}"
 
 def append_to_file(path: str, content: str) -> str:
     """Appends content to file."""
@@ -249,38 +538,129 @@ def append_to_file(path: str, content: str) -> str:
 
 # --- 5. Pro Features (System & Smart) ---
 
-def zip_folder(folder_path: str, output_path: str) -> str:
-    """Compresses folder to zip."""
+# mode -> (zipfile compression, compresslevel)
+ZIP_MODES = {
+    "store": (zipfile.ZIP_STORED, None),   # no compression; best for jpg/mp4/pdf
+    "deflate": (zipfile.ZIP_DEFLATED, 1),  # fastest deflate level, small ratio loss vs 6
+    "lzma": (zipfile.ZIP_LZMA, None),      # smallest, slowest
+}
+
+# zip_folder pipeline: worker threads pre-read small files while the main thread compresses
+# and writes (zlib releases the GIL), so disk reads overlap deflate instead of alternating.
+ZIP_PREFETCH_MAX_BYTES = 8 * 1024 * 1024   # larger files are streamed by ZipFile.write
+ZIP_PREFETCH_WINDOW = 16
+ZIP_READ_WORKERS = 4
+
+def _read_for_zip(path: str, size: int) -> Optional[bytes]:
+    if size > ZIP_PREFETCH_MAX_BYTES:
+        return None
+    with open(path, "rb") as f:
+        return f.read()
+
+def _write_zip_entry(zipf: zipfile.ZipFile, item, compression: int, level: Optional[int]):
+    fpath, arcname, future = item
+    data = future.result()
+    if data is None:
+        zipf.write(fpath, arcname)
+        return
+    zinfo = zipfile.ZipInfo.from_file(fpath, arcname)  # keeps mtime and permissions like write()
+    zipf.writestr(zinfo, data, compress_type=compression, compresslevel=level)
+
+def zip_folder(folder_path: str, output_path: str, mode: str = "deflate") -> str:
+    """Compresses folder to zip (store/deflate/lzma) or to .tar.zst (zstd)."""
     try:
         src = _resolve_path(folder_path)
         out = _resolve_path(output_path)
+        
+        # Walked paths all start with src + separator, so arcnames are a plain slice
+        # (os.path.relpath would re-normalize both paths for every file)
+        prefix_len = len(os.path.join(str(src), ""))
+        
+        if mode == "zstd":
+            if zstandard is None:
+                return "Error zipping: zstd mode requires the 'zstandard' package."
+            if not str(out).lower().endswith(".tar.zst"):
+                out = out.with_name(out.name + ".tar.zst")
+            # threads=-1: one compression worker per core
+            with open(out, "wb") as out_f, \
+                 zstandard.ZstdCompressor(threads=-1).stream_writer(out_f) as writer, \
+                 tarfile.open(fileobj=writer, mode="w|") as tar:
+                for entry, root in _iter_files(src):
+                    fpath = os.path.join(root, entry.name)
+                    tar.add(fpath, arcname=fpath[prefix_len:], recursive=False)
+            return f"Compressed to {out}"
+        
+        if mode not in ZIP_MODES:
+            return f"Error zipping: unknown mode '{mode}' (use {', '.join(ZIP_MODES)} or zstd)."
+        compression, level = ZIP_MODES[mode]
         if not str(out).lower().endswith(".zip"):
-            out = out.with_suffix(".zip")
+            out = out.with_name(out.name + ".zip")  # append: with_suffix would eat "backup.2024"
             
-        with zipfile.ZipFile(out, 'w', zipfile.ZIP_DEFLATED) as zipf:
-            for root, dirs, files in os.walk(src):
-                for file in files:
-                    file_path = Path(root) / file
-                    arcname = file_path.relative_to(src)
-                    zipf.write(file_path, arcname)
+        with zipfile.ZipFile(out, 'w', compression, compresslevel=level) as zipf, \
+             ThreadPoolExecutor(max_workers=ZIP_READ_WORKERS) as pool:
+            pending = deque()
+            for entry, root in _iter_files(src):
+                fpath = os.path.join(root, entry.name)
+                future = pool.submit(_read_for_zip, fpath, entry.stat().st_size)
+                pending.append((fpath, fpath[prefix_len:], future))
+                if len(pending) >= ZIP_PREFETCH_WINDOW:
+                    _write_zip_entry(zipf, pending.popleft(), compression, level)
+            while pending:
+                _write_zip_entry(zipf, pending.popleft(), compression, level)
         return f"Zipped to {out}"
     except Exception as e:
         return f"Error zipping: {e}"
 
+def _extract_tar_zst(src: Path, out: Path):
+    """Unpacks the .tar.zst written by zip_folder(mode="zstd"); shutil has no zstd format."""
+    if zstandard is None:
+        raise RuntimeError("extracting .tar.zst requires the 'zstandard' package")
+    out.mkdir(parents=True, exist_ok=True)
+    with open(src, "rb") as f, \
+         zstandard.ZstdDecompressor().stream_reader(f) as reader, \
+         tarfile.open(fileobj=reader, mode="r|") as tar:
+        # The "data" filter rejects absolute paths, .. escapes and device files (3.11.4+)
+        if hasattr(tarfile, "data_filter"):
+            tar.extractall(out, filter="data")
+        else:
+            tar.extractall(out)
+
 def extract_archive(archive_path: str, output_path: str) -> str:
-    """Extracts zip file."""
+    """Extracts zip file (or any shutil archive format, plus .tar.zst)."""
     try:
         src = _resolve_path(archive_path)
         out = _resolve_path(output_path)
-        shutil.unpack_archive(str(src), str(out))
+        if src.name.lower().endswith((".tar.zst", ".tzst")):
+            _extract_tar_zst(src, out)
+        else:
+            shutil.unpack_archive(str(src), str(out))
         return f"Extracted to {out}"
     except Exception as e:
         return f"Error extracting: {e}"
 
+# cpu_percent(interval=None) reports usage since the previous call without sleeping.
+# Prime it at import so the first real call already has a baseline; samples closer together
+# than CPU_SAMPLE_MIN_SECONDS are too noisy, so the last value is reused instead.
+CPU_SAMPLE_MIN_SECONDS = 0.1
+psutil.cpu_percent(interval=None)
+_CPU_SAMPLED_AT = time.monotonic()
+_LAST_CPU: Optional[float] = None
+
+def _cpu_percent() -> float:
+    global _CPU_SAMPLED_AT, _LAST_CPU
+    elapsed = time.monotonic() - _CPU_SAMPLED_AT
+    if elapsed < CPU_SAMPLE_MIN_SECONDS:
+        if _LAST_CPU is not None:
+            return _LAST_CPU
+        time.sleep(CPU_SAMPLE_MIN_SECONDS - elapsed)  # first call right after import
+    _LAST_CPU = psutil.cpu_percent(interval=None)
+    _CPU_SAMPLED_AT = time.monotonic()
+    return _LAST_CPU
+
 def check_resources() -> str:
     """Returns CPU and RAM usage."""
     try:
-        cpu = psutil.cpu_percent(interval=1)
+        cpu = _cpu_percent()
         mem = psutil.virtual_memory()
         return f"CPU Usage: {cpu}%\nRAM Usage: {mem.percent}% ({mem.used // (1024**2)}MB used)"
     except Exception as e:
@@ -302,66 +682,230 @@ def disk_usage() -> str:
     except Exception as e:
         return f"Error checking disk: {e}"
 
+def _process_rss(p) -> int:
+    mem = p.info.get('memory_info')
+    return mem.rss if mem else 0
+
 def list_processes() -> str:
     """Top 10 processes by Memory."""
     try:
-        procs = sorted(
-            psutil.process_iter(['name', 'memory_info']), 
-            key=lambda p: p.info['memory_info'].rss, 
-            reverse=True
-        )[:10]
+        # attrs= fetches only these fields in one pass; denied fields come back as None
+        procs = heapq.nlargest(
+            10,
+            psutil.process_iter(['name', 'memory_info']),
+            key=_process_rss
+        )
         
         lines = ["Top 10 Memory Hogs:"]
         for p in procs:
-            mem_mb = p.info['memory_info'].rss / (1024**2)
+            mem_mb = _process_rss(p) / (1024**2)
             lines.append(f"{p.info['name']}: {mem_mb:.1f} MB")
         return "\n".join(lines)
     except Exception as e:
         return f"Error listing processes: {e}"
 
+PREFIX_HASH_BYTES = 64 * 1024
+
+# Linux: hint a whole batch of prefix reads to the kernel before consuming any of them,
+# so the block layer sees a deep queue instead of one synchronous read at a time.
+PREFETCH_BATCH = 256
+_HAS_FADVISE = hasattr(os, "posix_fadvise")
+
+def _read_prefix_batches(paths: List[str]) -> Iterator[List[Tuple[str, bytes]]]:
+    """Yields batches of (path, first 64 KiB) for readable paths, batching readahead hints."""
+    for start in range(0, len(paths), PREFETCH_BATCH):
+        opened = []
+        for path in paths[start:start + PREFETCH_BATCH]:
+            try:
+                fd = os.open(path, os.O_RDONLY | getattr(os, "O_BINARY", 0))
+            except OSError:
+                continue
+            if _HAS_FADVISE:
+                os.posix_fadvise(fd, 0, PREFIX_HASH_BYTES, os.POSIX_FADV_WILLNEED)
+            opened.append((path, fd))
+        
+        batch = []
+        for path, fd in opened:
+            try:
+                batch.append((path, os.read(fd, PREFIX_HASH_BYTES)))
+            except OSError:
+                pass
+            finally:
+                os.close(fd)
+        yield batch
+
+# hashlib releases the GIL for buffers over 2 KiB, so plain threads hash in parallel
+HASH_WORKERS = min(8, os.cpu_count() or 1)
+# Full-file hashing is mostly waiting on reads; oversubscribe to keep the disk queue full
+IO_HASH_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+def _prefix_digest(head: bytes) -> bytes:
+    if xxhash is not None:
+        return xxhash.xxh3_128_digest(head)
+    return hashlib.blake2b(head, digest_size=16).digest()
+
+def _hash_full(path: str, size: int) -> Optional[bytes]:
+    """Whole-file content hash (xxh3_128, BLAKE3 or SHA-256) over a zero-copy mmap.
+    
+    Only called for files larger than the prefix, so mmap always pays off. Returns None if
+    the file no longer has the size it was bucketed by.
+    """
+    if xxhash is not None:
+        h = xxhash.xxh3_128()
+    elif blake3 is not None:
+        h = blake3.blake3()  # single-threaded: files are already hashed in parallel
+    else:
+        h = hashlib.sha256()
+    with open(path, "rb") as f:
+        fd = f.fileno()
+        # Changed since the scan; also keeps mmap away from a file truncated to 0
+        if os.fstat(fd).st_size != size:
+            return None
+        # Ask for aggressive readahead, then drop the pages once hashed so a large scan
+        # does not push the rest of the system out of the page cache
+        if _HAS_FADVISE:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        try:
+            with mmap.mmap(fd, 0, access=mmap.ACCESS_READ) as mm:
+                if hasattr(mm, "madvise") and hasattr(mmap, "MADV_SEQUENTIAL"):
+                    mm.madvise(mmap.MADV_SEQUENTIAL)
+                # Pages are faulted in on demand; nothing is copied onto the Python heap
+                with memoryview(mm) as mv:
+                    h.update(mv)
+                if hasattr(mm, "madvise") and hasattr(mmap, "MADV_DONTNEED"):
+                    mm.madvise(mmap.MADV_DONTNEED)
+        finally:
+            if _HAS_FADVISE:
+                os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+    return h.digest()
+
+def _try_hash_full(candidate: Tuple[str, int]) -> Optional[bytes]:
+    path, size = candidate
+    try:
+        return _hash_full(path, size)
+    except (OSError, ValueError):  # ValueError: mmap of a file emptied after the size check
+        return None
+
 def find_duplicates(folder_path: str) -> str:
     """Finds duplicate files by content hash."""
     try:
         root_path = _resolve_path(folder_path)
-        hashes = {}
+        
+        # 1. Bucket by size; a file with a unique size cannot have a duplicate
+        by_size = defaultdict(list)
+        seen_inodes = set()
+        for entry, root in _iter_files(root_path):
+            try:
+                st = entry.stat()
+            except OSError:
+                continue
+            # Hardlinks share storage, so they are not duplicates. (DirEntry.stat() leaves
+            # st_ino at 0 on Windows; skip the check there.)
+            if st.st_ino:
+                inode = (st.st_dev, st.st_ino)
+                if inode in seen_inodes: continue
+                seen_inodes.add(inode)
+            by_size[st.st_size].append(os.path.join(root, entry.name))
+        
+        # Empty files are trivially identical; no need to open them
+        groups = []
+        empty = by_size.pop(0, [])
+        if len(empty) > 1:
+            groups.append(empty)
+        
+        # 2. Split by a hash of the first 64 KiB
+        sizes = {p: size for size, paths in by_size.items() if len(paths) > 1 for p in paths}
+        by_prefix = defaultdict(list)
+        with ThreadPoolExecutor(max_workers=HASH_WORKERS) as pool:
+            for batch in _read_prefix_batches(list(sizes)):
+                digests = pool.map(_prefix_digest, [head for _, head in batch])
+                for (path, _), digest in zip(batch, digests):
+                    by_prefix[(sizes[path], digest)].append(path)
+        
+        # 3. Full hash only if the prefix did not already cover the whole file
+        full_candidates = []
+        for (size, _), group in by_prefix.items():
+            if len(group) < 2: continue
+            if size > PREFIX_HASH_BYTES:
+                full_candidates.extend((p, size) for p in group)
+            else:
+                groups.append(group)
+        
+        by_full = defaultdict(list)
+        with ThreadPoolExecutor(max_workers=IO_HASH_WORKERS) as pool:
+            for (path, size), digest in zip(full_candidates, pool.map(_try_hash_full, full_candidates)):
+                if digest is not None:
+                    by_full[(size, digest)].append(path)
+        groups.extend(g for g in by_full.values() if len(g) > 1)
+        
         dupes = []
+        for same in groups:
+            dupes.extend(f"{p} == {same[0]}" for p in same[1:])
         
-        for root, dirs, files in os.walk(root_path):
-            for file in files:
-                fpath = Path(root) / file
-                try:
-                   file_hash = hashlib.md5(fpath.read_bytes()).hexdigest()
-                   if file_hash in hashes:
-                       dupes.append(f"{fpath} == {hashes[file_hash]}")
-                   else:
-                       hashes[file_hash] = fpath
-                except: pass
-                
         if not dupes: return "No duplicates found."
         return "Duplicates found:\n" + "\n".join(dupes[:20])
     except Exception as e:
         return f"Error finding duplicates: {e}"
 
+LARGE_FILES_LIMIT = 20
+
 def find_large_files(folder_path: str, size_mb_threshold: int = 100) -> str:
     """Finds files larger than threshold."""
     try:
         root_path = _resolve_path(folder_path)
-        large_files = []
+        largest = []  # min-heap of (size, dir, name), capped at LARGE_FILES_LIMIT
         limit_bytes = size_mb_threshold * 1024 * 1024
         
-        for root, dirs, files in os.walk(root_path):
-            for file in files:
-                fpath = Path(root) / file
-                try:
-                    size = fpath.stat().st_size
-                    if size > limit_bytes:
-                        large_files.append(f"{fpath} ({size/(1024**2):.1f} MB)")
-                except: pass
+        for entry, root in _iter_files(root_path):
+            try:
+                size = entry.stat().st_size  # fstatat on the open directory, no path walk
+            except OSError: continue
+            if size > limit_bytes:
+                item = (size, root, entry.name)
+                if len(largest) < LARGE_FILES_LIMIT:
+                    heapq.heappush(largest, item)
+                elif item > largest[0]:
+                    heapq.heapreplace(largest, item)
         
-        return "\n".join(large_files[:20])
+        # Paths and sizes are only formatted for the survivors
+        return "\n".join(
+            f"{os.path.join(root, name)} ({size/(1024**2):.1f} MB)"
+            for size, root, name in sorted(largest, reverse=True)
+        )
     except Exception as e:
         return f"Error finding large files: {e}"
 
+@functools.lru_cache(maxsize=1)
+def _pygit2():
+    """Optional libgit2 bindings, imported on first use: the import alone costs ~75 ms."""
+    try:
+        import pygit2
+    except ImportError:
+        return None
+    return pygit2
+
+def _git_commit_pygit2(pygit2, path: Path, message: str) -> Optional[str]:
+    """init (if needed) + add -A + commit, in-process via libgit2. Returns an error message or None."""
+    if (path / ".git").exists():
+        repo = pygit2.Repository(str(path))
+    else:
+        repo = pygit2.init_repository(str(path))
+    repo.index.add_all()
+    repo.index.write()
+    tree = repo.index.write_tree()
+    
+    parents = [] if repo.head_is_unborn else [repo.head.target]
+    if parents and repo[parents[0]].tree_id == tree:
+        return  # nothing to commit, same as `git commit` on a clean tree
+    try:
+        sig = repo.default_signature
+    except (KeyError, pygit2.GitError):
+        # Same refusal as the git CLI; a made-up author could end up pushed
+        return ('Git error: no commit identity configured. Run git config --global user.name "Your Name" '
+                'and git config --global user.email "you@example.com" first.')
+    repo.create_commit("HEAD", sig, sig, message, tree, parents)
+    return None
+
 # --- Re-export old tools for compatibility ---
 def git_manager(repo_path: str, remote_url: Optional[str] = None, commit_message: str = "Update") -> str:
     # (Simplified re-implementation or import if I kept the old file, but I overwrote it)
@@ -371,10 +915,16 @@ def git_manager(repo_path: str, remote_url: Optional[str] = None, commit_message
     path = Path(repo_path)
     if not path.exists(): return "Path not found."
     try:
-        if not (path / ".git").exists():
-            subprocess.run(["git", "init"], cwd=path, check=True)
-        subprocess.run(["git", "add", "."], cwd=path, check=True)
-        subprocess.run(["git", "commit", "-m", commit_message], cwd=path, check=False) # might fail if empty
+        pygit2 = _pygit2()
+        if pygit2 is not None:
+            error = _git_commit_pygit2(pygit2, path, commit_message)
+            if error: return error
+        else:
+            if not (path / ".git").exists():
+                subprocess.run(["git", "init"], cwd=path, check=True)
+            subprocess.run(["git", "add", "."], cwd=path, check=True)
+            subprocess.run(["git", "commit", "-m", commit_message], cwd=path, check=False) # might fail if empty
+        # Push stays on the git CLI so the user's credential helpers and SSH config apply
         if remote_url:
             subprocess.run(["git", "push", remote_url], cwd=path, check=False)
         return "Git operations ran."
@@ -385,6 +935,8 @@ def git_manager(repo_path: str, remote_url: Optional[str] = None, commit_message
 def manage_files(action: str, files: List[str], target: Optional[str] = None) -> str:
     # Map old generic tool to new specific ones
     log = []
+    if action in ("move", "copy") and target:
+        os.makedirs(target, exist_ok=True)
     for f in files:
         if action == "delete": log.append(delete_file(f))
         elif action == "move" and target: shutil.move(f, str(Path(target)/Path(f).name)); log.append(f"Moved {f}")